@@ -1,3 +1,19 @@
-from .converter import Converter
-from .page.Page import Page
-from .main import parse
\ No newline at end of file
+# -*- coding: utf-8 -*-
+
+'''Import the public API lazily, so that ``import pdf2docx`` doesn't load any heavy dependency,
+e.g. ``PyMuPDF`` and ``python-docx``, until it is really used.'''
+
+__all__ = ['Converter', 'Page', 'parse']
+
+
+def __getattr__(name:str):
+    if name=='Converter':
+        from .converter import Converter
+        return Converter
+    if name=='Page':
+        from .page.Page import Page
+        return Page
+    if name=='parse':
+        from .main import parse
+        return parse
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+'''Convert a batch of PDF files with a file-level process pool.
+
+``multi_processing`` of :py:class:`~pdf2docx.converter.Converter` parallelizes pages within
+one document, which hardly helps when converting many small PDF files. Here each worker
+process converts whole files instead:
+
+* Input files are collected from a directory, a glob pattern or a manifest file listing one
+  PDF path per line. Docx files keep the relative paths to the source root under the output
+  folder, and files with same target path are rejected.
+* Files are dispatched in descending order of page count, so that the large files start
+  first and the small ones fill the gaps, i.e. workload is balanced by page count.
+* Each finished file is appended to a JSONL status log, which is also the manifest of completed
+  outputs: files converted successfully in a previous run are skipped when resuming.
+
+Example::
+
+    $ pdf2docx batch ./pdfs --output_dir=./docx --workers=8
+    $ pdf2docx batch "./pdfs/**/*.pdf" --log_file=status.jsonl
+    $ pdf2docx batch files.txt --resume=False
+'''
+
+import os
+import glob
+import json
+import logging
+from time import perf_counter
+from multiprocessing import Pool, cpu_count
+
+
+def collect_files(source:str):
+    '''Collect PDF files from a directory, glob pattern or manifest file.
+
+    Args:
+        source (str): Directory (searched recursively), glob pattern, or text file with one pdf
+            path per line. Relative paths in manifest are relative to the manifest file.
+
+    Returns:
+        list: Absolute paths of PDF files.
+    '''
+    if os.path.isdir(source):
+        files = glob.glob(os.path.join(source, '**', '*.pdf'), recursive=True)
+
+    elif os.path.isfile(source) and not source.lower().endswith('.pdf'):
+        root = os.path.dirname(os.path.abspath(source))
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+        files = [os.path.join(root, line) for line in lines if line and not line.startswith('#')]
+
+    else:
+        files = glob.glob(source, recursive=True)
+
+    # unique files in order
+    return list(dict.fromkeys(os.path.abspath(f) for f in files))
+
+
+def source_root(source:str):
+    '''Root folder of the source: the directory itself, folder of the manifest file, or the
+    leading folder of glob pattern without wildcards, e.g. ``./pdfs`` for ``./pdfs/**/*.pdf``.'''
+    if os.path.isdir(source): return os.path.abspath(source)
+    root = os.path.dirname(source)
+    while glob.has_magic(root): root = os.path.dirname(root)
+    return os.path.abspath(root or os.curdir)
+
+
+def docx_path(pdf_file:str, source:str, output_dir:str=None):
+    '''Target docx path: same folder with the pdf file, or the relative path to the source root
+    under ``output_dir``.'''
+    name = os.path.splitext(pdf_file)[0] + '.docx'
+    if not output_dir: return name
+
+    rel = os.path.relpath(name, source_root(source))
+    if rel.startswith(os.pardir): rel = os.path.basename(name) # outside the source folder
+    return os.path.join(os.path.abspath(output_dir), rel)
+
+
+def completed_files(log_file:str):
+    '''PDF files converted successfully according to the status log.'''
+    res = set()
+    if not log_file or not os.path.exists(log_file): return res
+    with open(log_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue # e.g. incomplete line of an interrupted run
+            if record.get('status')=='ok' and os.path.exists(record.get('docx', '')):
+                res.add(record['pdf'])
+            else:
+                res.discard(record.get('pdf'))
+    return res
+
+
+def page_count(pdf_file:str):
+    '''Page count as workload of a file, or 0 if failed to open.'''
+    import fitz
+    try:
+        with fitz.open(pdf_file) as doc: return doc.page_count
+    except Exception:
+        return 0
+
+
+def _init_worker():
+    logging.getLogger().setLevel(logging.WARNING) # mute page-level logs
+
+
+def _convert_file(job:tuple):
+    '''Convert one file in worker process and return the status record.'''
+    from .converter import Converter
+    pdf_file, docx_file, pages, password, kwargs = job
+    record = {'pdf': pdf_file, 'docx': docx_file, 'pages': pages}
+    t0 = perf_counter()
+    try:
+        os.makedirs(os.path.dirname(docx_file), exist_ok=True)
+        cv = Converter(pdf_file, password)
+        try:
+            cv.convert(docx_file, **kwargs)
+        finally:
+            cv.close()
+    except Exception as e:
+        record.update({'status': 'error', 'error': f'{e.__class__.__name__}: {e}'})
+    else:
+        record['status'] = 'ok'
+    record['time'] = round(perf_counter()-t0, 3)
+    return record
+
+
+def convert_batch(source:str, output_dir:str=None, log_file:str=None, workers:int=0,
+                    resume:bool=True, password:str=None, **kwargs):
+    '''Convert PDF files in parallel.
+
+    Args:
+        source (str): Directory, glob pattern or manifest file of PDF files.
+        output_dir (str, optional): Folder to write docx files. Defaults to None, i.e. same folder
+            with the pdf file.
+        log_file (str, optional): JSONL status log. Defaults to ``pdf2docx-batch.jsonl`` under
+            ``output_dir``, or current folder.
+        workers (int, optional): Count of worker processes. Defaults to 0, i.e. cpu count.
+        resume (bool, optional): Skip files converted successfully according to the status log.
+            Defaults to True.
+        password (str, optional): Password for encrypted pdf files.
+        kwargs (dict): Configuration parameters, see
+            :py:meth:`~pdf2docx.converter.Converter.default_settings`.
+
+    Returns:
+        dict: Count of converted, failed and skipped files.
+    '''
+    if not log_file: log_file = os.path.join(output_dir or os.getcwd(), 'pdf2docx-batch.jsonl')
+    kwargs['multi_processing'] = False # parallel in file level
+
+    files = collect_files(source)
+
+    # files outside the source root are written by name, which must not overwrite each other
+    targets = {pdf_file: docx_path(pdf_file, source, output_dir) for pdf_file in files}
+    sources = {}
+    for pdf_file, docx_file in targets.items():
+        if docx_file in sources:
+            raise ValueError(f'Same target {docx_file} for {sources[docx_file]} and {pdf_file}.')
+        sources[docx_file] = pdf_file
+
+    done = completed_files(log_file) if resume else set()
+    todo = [f for f in files if f not in done]
+    summary = {'ok': 0, 'error': 0, 'skipped': len(files)-len(todo)}
+    if not todo:
+        logging.info('No file to convert.')
+        return summary
+
+    num = len(todo)
+    workers = min(workers or cpu_count(), num)
+    logging.info('Converting %d files with %d processes...', num, workers)
+    os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+    with open(log_file, 'a', encoding='utf-8') as f, \
+        Pool(workers, initializer=_init_worker) as pool:
+        # balance workload: the largest files first, while pages are counted in workers
+        counts = pool.map(page_count, todo)
+        jobs = [(pdf_file, targets[pdf_file], pages, password, kwargs) \
+                    for pdf_file, pages in zip(todo, counts)]
+        jobs.sort(key=lambda job: job[2], reverse=True)
+
+        for i, record in enumerate(pool.imap_unordered(_convert_file, jobs, chunksize=1), start=1):
+            f.write(json.dumps(record) + '\n')
+            f.flush() # keep the log complete for resuming from interruption
+            summary[record['status']] += 1
+            logging.info('(%d/%d) %s: %s', i, num, record['status'], record['pdf'])
+
+    return summary
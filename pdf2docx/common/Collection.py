@@ -3,10 +3,23 @@
 '''A group of instances, e.g. Blocks, Lines, Spans, Shapes.
 '''
 
+import threading
+from collections import OrderedDict
 import fitz
 from .Element import Element
 from .share import (IText, TextDirection)
-from .algorithm import (solve_rects_intersection, graph_bfs)
+from .algorithm import (solve_rects_intersection, graph_bfs, projection_groups)
+
+
+# Cached results of grouping instances by rows/columns, in indexes of instances.
+# NOTE: these groupings depend on the bbox and text direction of instances only, so they're
+# keyed by these properties rather than the collection object. Accordingly:
+# - any mutation on the collection, e.g. add/remove instances, sort instances, or change bbox
+#   of an instance, leads to a different key, i.e. invalidates the cached results;
+# - collections with same layout share the results, e.g. lines copied to nested cell layouts.
+_GROUPS_CACHE = OrderedDict()
+_GROUPS_CACHE_SIZE = 256
+_GROUPS_CACHE_LOCK = threading.Lock()
 
 
 class BaseCollection:
@@ -87,11 +100,13 @@ class Collection(BaseCollection, IText):
         return list(res)[0] if len(res)==1 else TextDirection.MIX 
 
 
-    def group(self, fun):
+    def group(self, fun, candidates:list=None):
         """Group instances according to user defined criterion.
 
         Args:
             fun (function): with 2 arguments representing 2 instances (Element) and return bool.
+            candidates (list, optional): Lists of instance indexes in ascending order; only
+                instances in same list are checked with ``fun``. Defaults to None, i.e. all pairs.
 
         Returns:
             list: a list of grouped ``Collection`` instances.
@@ -115,12 +130,14 @@ class Collection(BaseCollection, IText):
         # NOTE: O(n^2) method, but it's acceptable (~0.2s) when n<1000 which is satisfied by page blocks
         num = len(self._instances)
         index_groups = [set() for i in range(num)] # type: list[set]        
-        for i, instance in enumerate(self._instances):
+        for indexes in (candidates if candidates is not None else [range(num)]):
             # connections of current instance to all instances after it
-            for j in range(i+1, num):
-                if fun(instance, self._instances[j]):
-                    index_groups[i].add(j)
-                    index_groups[j].add(i)
+            for k, i in enumerate(indexes):
+                instance = self._instances[i]
+                for j in indexes[k+1:]:
+                    if fun(instance, self._instances[j]):
+                        index_groups[i].add(j)
+                        index_groups[j].add(i)
 
         # search graph -> grouped index of instance
         groups = graph_bfs(index_groups)
@@ -167,11 +184,57 @@ class Collection(BaseCollection, IText):
         return groups
     
     
-    def group_by_columns(self, factor:float=0.0, sorted:bool=True, text_direction:bool=False):
-        '''Group elements into columns based on the bbox.'''
+    def _cached_groups(self, key:tuple, fun):
+        '''Get groups from cache, or group instances with ``fun`` and cache the results.
+
+        Args:
+            key (tuple): Grouping method and arguments.
+            fun (function): Function without arguments, returning a list of grouped collections.
+
+        Returns:
+            list: A list of new grouped ``Collection`` instances, safe to modify.
+        '''
+        fingerprint = tuple((tuple(e.bbox), e.text_direction) for e in self._instances)
+        key = (self.__class__, key, fingerprint)
+        with _GROUPS_CACHE_LOCK:
+            index_groups = _GROUPS_CACHE.get(key)
+            if index_groups is not None: _GROUPS_CACHE.move_to_end(key)
+
+        if index_groups is None:
+            groups = fun()
+
+            # convert to indexes, so the results could be restored for any collections with
+            # same fingerprint; skip caching if duplicated instances exist
+            indexes = {id(e): i for i, e in enumerate(self._instances)}
+            if len(indexes)<len(self._instances): return groups
+            index_groups = [[indexes[id(e)] for e in group] for group in groups]
+
+            with _GROUPS_CACHE_LOCK:
+                _GROUPS_CACHE[key] = index_groups
+                if len(_GROUPS_CACHE)>_GROUPS_CACHE_SIZE: _GROUPS_CACHE.popitem(last=False)
+            return groups
+
+        return [self.__class__([self._instances[i] for i in group]) for group in index_groups]
+
+
+    def group_by_columns(self, factor:float=0.0, sorted:bool=True, text_direction:bool=False, projection:bool=False):
+        '''Group elements into columns based on the bbox.
+
+        Args:
+            projection (bool, optional): Split columns by gaps of the x-projection profile rather
+                than checking elements pairwise. Same results but O(nlog n); ``factor=0`` only.
+        '''
+        return self._cached_groups(('columns', factor, sorted, text_direction, projection), 
+                    lambda: self._group_by_columns(factor, sorted, text_direction, projection))
+
+    def _group_by_columns(self, factor:float, sorted:bool, text_direction:bool, projection:bool=False):
         # split in columns
-        fun = lambda a,b: a.vertically_align_with(b, factor=factor, text_direction=text_direction)
-        groups = self.group(fun)
+        if projection:
+            idx = 1 if text_direction and self.is_vertical_text else 0
+            groups = self._group_by_projection(idx, factor)
+        else:
+            fun = lambda a,b: a.vertically_align_with(b, factor=factor, text_direction=text_direction)
+            groups = self.group(fun)
         
         # increase in x-direction if sort
         if sorted: 
@@ -208,11 +271,24 @@ class Collection(BaseCollection, IText):
         else:
             return [self.__class__(sorted_instantces[:max_idx+1]), self.__class__(sorted_instantces[max_idx+1:])]
 
-    def group_by_rows(self, factor:float=0.0, sorted:bool=True, text_direction:bool=False):
-        '''Group elements into rows based on the bbox.'''
+    def group_by_rows(self, factor:float=0.0, sorted:bool=True, text_direction:bool=False, projection:bool=False):
+        '''Group elements into rows based on the bbox.
+
+        Args:
+            projection (bool, optional): Split rows by gaps of the y-projection profile rather
+                than checking elements pairwise. Same results but O(nlog n); ``factor=0`` only.
+        '''
+        return self._cached_groups(('rows', factor, sorted, text_direction, projection), 
+                    lambda: self._group_by_rows(factor, sorted, text_direction, projection))
+
+    def _group_by_rows(self, factor:float, sorted:bool, text_direction:bool, projection:bool=False):
         # split in rows
-        fun = lambda a,b: a.horizontally_align_with(b, factor=factor, text_direction=text_direction)
-        groups = self.group(fun)
+        if projection:
+            idx = 0 if text_direction and self.is_vertical_text else 1
+            groups = self._group_by_projection(idx, factor)
+        else:
+            fun = lambda a,b: a.horizontally_align_with(b, factor=factor, text_direction=text_direction)
+            groups = self.group(fun)
 
         # increase in y-direction if sort
         if sorted: 
@@ -222,10 +298,26 @@ class Collection(BaseCollection, IText):
         return groups
 
 
+    def _group_by_projection(self, idx:int, factor:float):
+        '''Group instances whose bbox-es are connected in the projection to x (``idx=0``) or y
+        (``idx=1``) direction. Instances with empty bbox are not aligned with any others.
+        '''
+        if factor: raise ValueError('Grouping by projection profile supports factor=0 only.')
+        valid = [i for i, instance in enumerate(self._instances) if instance]
+        intervals = [(self._instances[i].bbox[idx], self._instances[i].bbox[idx+2]) for i in valid]
+        index_groups = [[valid[k] for k in group] for group in projection_groups(intervals)]
+        index_groups.extend([i] for i, instance in enumerate(self._instances) if not instance)
+        return [self.__class__([self._instances[i] for i in group]) for group in index_groups]
+
+
     def group_by_physical_rows(self, sorted:bool=False, text_direction:bool=False):
         '''Group lines into physical rows.'''
+        return self._cached_groups(('physical_rows', sorted, text_direction), 
+                    lambda: self._group_by_physical_rows(sorted, text_direction))
+
+    def _group_by_physical_rows(self, sorted:bool, text_direction:bool):
         fun = lambda a,b: a.in_same_row(b)
-        groups = self.group(fun)
+        groups = self.group(fun, self._physical_row_candidates())
 
         # increase in y-direction if sort
         if sorted: 
@@ -235,6 +327,34 @@ class Collection(BaseCollection, IText):
         return groups
 
 
+    def _physical_row_candidates(self):
+        '''Split instance indexes into candidates of physical rows with a sweep line.
+
+        Taking horizontal text for example, ``a.in_same_row(b)`` is equal to ``cb<=a.y1`` if the
+        center line ``ca<=cb``. So sorting instances by center line, a new row starts once the
+        center exceeds the bottom edge of all previous instances, i.e. no instance after it
+        could be in same row with any instance before it.
+        '''
+        candidates = []
+        for horizontal in (True, False):
+            idx = 1 if horizontal else 0
+            indexes = [i for i, instance in enumerate(self._instances) \
+                            if instance and instance.is_horizontal_text==horizontal]
+            indexes.sort(key=lambda i: (self._instances[i].bbox[idx]+self._instances[i].bbox[idx+2])/2.0)
+
+            row, bottom = [], None
+            for i in indexes:
+                bbox = self._instances[i].bbox
+                if row and (bbox[idx]+bbox[idx+2])/2.0 > bottom:
+                    candidates.append(sorted(row))
+                    row, bottom = [], None
+                row.append(i)
+                bottom = bbox[idx+2] if bottom is None else max(bottom, bbox[idx+2])
+            if row: candidates.append(sorted(row))
+
+        return candidates
+
+
     def sort_in_reading_order(self):
         '''Sort collection instances in reading order (considering text direction), e.g.
             for normal reading direction: from top to bottom, from left to right.
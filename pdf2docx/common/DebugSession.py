@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+'''Collect debug plots of parsing stages into one pdf file.
+
+Each stage decorated by :py:func:`~pdf2docx.common.share.debug_plot` adds a new page to the
+debug document. Saving the whole, growing document after every stage makes debug mode
+quadratic, so the session writes the pages once when closed, or incrementally, i.e. appending
+only the new pages to the file, after every ``flush_pages`` plotted pages.
+
+Example::
+
+    with DebugSession('debug.pdf', pages=[0, 2]) as session:
+        cv.convert(docx_file, debug=True, debug_session=session)
+'''
+
+import fitz
+from .share import new_page
+
+
+class DebugSession:
+    '''Buffered debug pdf with optional filter on pages to plot.'''
+
+    def __init__(self, filename:str, pages:list=None, flush_pages:int=0):
+        '''
+        Args:
+            filename (str): Debug pdf file to write.
+            pages (list, optional): Indexes of pages to plot, counted from zero. Defaults to
+                None, i.e. all pages.
+            flush_pages (int, optional): Append plotted pages to file after this count of new
+                pages. Defaults to 0, i.e. write once when closed.
+        '''
+        self.filename = filename
+        self.pages = None if pages is None else set(pages)
+        self.flush_pages = flush_pages
+        self._doc = fitz.Document()
+        self._saved = False # saved to file already, so save incrementally afterwards
+        self._pending = 0   # count of pages not written yet
+
+
+    def __enter__(self): return self
+
+    def __exit__(self, *args): self.close()
+
+
+    def accept(self, page_id:int):
+        '''Whether to plot the page with given index.'''
+        return self.pages is None or page_id is None or page_id in self.pages
+
+
+    def plot(self, objects, width:float, height:float, title:str):
+        '''Plot objects, e.g. text blocks, shapes and tables, on a new page with given title.'''
+        objects.plot(new_page(self._doc, width, height, title))
+        self._pending += 1
+        if self.flush_pages and self._pending>=self.flush_pages: self.flush()
+
+
+    def flush(self):
+        '''Write pending pages to file.'''
+        if not self._pending: return
+        if self._saved:
+            self._doc.saveIncr()
+        else:
+            # re-open the saved file, so that the following pages could be appended incrementally
+            self._doc.save(self.filename)
+            self._doc.close()
+            self._doc = fitz.Document(self.filename)
+            self._saved = True
+        self._pending = 0
+
+
+    def close(self):
+        '''Write pending pages and close the debug document.'''
+        if self._doc.is_closed: return
+        self.flush()
+        self._doc.close()
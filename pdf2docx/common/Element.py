@@ -17,34 +17,61 @@ CS. If final coordinates are provided, should update it after creating an empty
 '''
 
 import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
 import fitz
 from .share import IText
 from . import constants
 
 
-class Element(IText):
-    '''Boundary box with attribute in fitz.Rect type.'''
+# all coordinates are related to un-rotated page in PyMuPDF
+# e.g. Matrix(0.0, 1.0, -1.0, 0.0, 842.0, 0.0)
+# NOTE: rotation matrix of the page being processed in current thread, so that pages could be 
+# parsed concurrently
+_ROTATION_MATRIX = ContextVar('rotation_matrix', default=fitz.Matrix(0.0)) # rotation angle = 0 degree by default
 
-    # all coordinates are related to un-rotated page in PyMuPDF
-    # e.g. Matrix(0.0, 1.0, -1.0, 0.0, 842.0, 0.0)
-    ROTATION_MATRIX = fitz.Matrix(0.0) # rotation angle = 0 degree by default
 
+class Element(IText):
+    '''Boundary box with attribute in fitz.Rect type.'''
 
     @classmethod
     def set_rotation_matrix(cls, rotation_matrix):
-        """Set global rotation matrix.
+        """Set rotation matrix of current context, e.g. current thread.
 
         Args:
             Rotation_matrix (fitz.Matrix): target matrix
         """        
         if rotation_matrix and isinstance(rotation_matrix, fitz.Matrix):
-            cls.ROTATION_MATRIX = rotation_matrix
+            _ROTATION_MATRIX.set(rotation_matrix)
+
+
+    @classmethod
+    def get_rotation_matrix(cls):
+        '''Rotation matrix of current context.'''
+        return _ROTATION_MATRIX.get()
+
+
+    @classmethod
+    @contextmanager
+    def rotation_context(cls, rotation_matrix):
+        '''Apply rotation matrix to the elements created in the enclosed process, e.g. 
+        extracting a page, and restore the previous one when exit.
+
+        Args:
+            Rotation_matrix (fitz.Matrix): target matrix
+        '''
+        if not isinstance(rotation_matrix, fitz.Matrix): rotation_matrix = fitz.Matrix(0.0)
+        token = _ROTATION_MATRIX.set(rotation_matrix)
+        try:
+            yield rotation_matrix
+        finally:
+            _ROTATION_MATRIX.reset(token)
 
 
     @classmethod
     def pure_rotation_matrix(cls):
         '''Pure rotation matrix used for calculating text direction after rotation.'''
-        a,b,c,d,e,f = cls.ROTATION_MATRIX
+        a,b,c,d,e,f = _ROTATION_MATRIX.get()
         return fitz.Matrix(a,b,c,d,0,0)
 
 
@@ -55,7 +82,7 @@ class Element(IText):
 
         # NOTE: Any coordinates provided in raw is in original page CS (without considering page rotation).
         if 'bbox' in (raw or {}):
-            rect = fitz.Rect(raw['bbox']) * Element.ROTATION_MATRIX
+            rect = fitz.Rect(raw['bbox']) * _ROTATION_MATRIX.get()
             self.update_bbox(rect)
 
 
@@ -1,6 +1,4 @@
 from collections import deque
-import numpy as np
-import cv2 as cv
 
 
 # -------------------------------------------------------------------------------------------
@@ -67,6 +65,101 @@ def _graph_bfs_from_node(graph, start):
             search_queue.append(node)
 
 
+# -------------------------------------------------------------------------------------------
+# Index of 1D intervals, e.g. y-range of shapes, for querying the overlapped ones
+# -------------------------------------------------------------------------------------------
+class IntervalIndex:
+    '''Static index of closed intervals sorted by the lower bound.
+
+    Performance::
+
+        O(nlog n) to build; O(log n + m) to query, where m is the count of intervals whose
+        lower bound is not larger than the upper bound of query interval.
+    '''
+
+    def __init__(self, intervals:list):
+        '''
+        Args:
+            intervals (list): Intervals in ``[(lo, hi), (...), ...]``.
+        '''
+        import numpy as np
+        arr = np.array(intervals, dtype=float).reshape(-1, 2)
+        self._order = np.argsort(arr[:, 0], kind='stable')
+        self._lo = arr[self._order, 0]
+        self._hi = arr[self._order, 1]
+
+    def __len__(self): return self._order.size
+
+    def query(self, lo:float, hi:float):
+        '''Indexes of intervals overlapping ``[lo, hi]``, boundary included.
+
+        Returns:
+            list: Indexes in ascending order, i.e. the original order of intervals.
+        '''
+        import numpy as np
+        n = np.searchsorted(self._lo, hi, side='right')
+        indexes = self._order[:n][self._hi[:n]>=lo]
+        return np.sort(indexes).tolist()
+
+
+def projection_groups(intervals:list, tolerance:float=1e-3):
+    '''Group intervals by gaps of their projection profile, i.e. the 1D coverage of all intervals.
+
+    Intervals in same group cover a continuous range, which is equal to the connected
+    components of the overlapping graph, but O(nlog n) rather than O(n^2).
+
+    Args:
+        intervals (list): Intervals in ``[(lo, hi), (...), ...]``.
+        tolerance (float, optional): Two intervals are connected if the gap is within this value.
+
+    Returns:
+        list: Groups of interval indexes, ascending in each group; groups are sorted by the
+        lower bound.
+    '''
+    import numpy as np
+    arr = np.array(intervals, dtype=float).reshape(-1, 2)
+    if not arr.size: return []
+
+    # sweep along the sorted lower bounds: a gap exists where the lower bound exceeds the
+    # farthest upper bound covered so far
+    order = np.argsort(arr[:, 0], kind='stable')
+    lo, hi = arr[order, 0], arr[order, 1]
+    coverage = np.maximum.accumulate(hi)
+    gaps = np.flatnonzero(lo[1:] > coverage[:-1]+tolerance) + 1
+    return [np.sort(group).tolist() for group in np.split(order, gaps)]
+
+
+def intersected_pairs(rects:list):
+    '''Pairs of intersected rectangles, edges included.
+
+    Rectangles sorted by ``y0`` are swept from top to bottom, so each one is checked with only
+    the following ones starting above its bottom edge, i.e. O(nlog n + k) for sparse layout,
+    e.g. text lines, where k is the count of pairs overlapping in y-direction.
+
+    Args:
+        rects (list): Rectangles in ``[(x0, y0, x1, y1), (...), ...]``.
+
+    Returns:
+        list: Index pairs ``(i, j)`` with ``i<j``, in ascending order.
+    '''
+    import numpy as np
+    arr = np.array(rects, dtype=float).reshape(-1, 4)
+    order = np.argsort(arr[:, 1], kind='stable')
+    x0, y0, x1, y1 = arr[order].T
+    ends = np.searchsorted(y0, y1, side='right')
+
+    pairs = []
+    for k in range(order.size):
+        if ends[k]<=k+1: continue
+        js = np.arange(k+1, ends[k])
+        js = js[(x0[js]<=x1[k]) & (x1[js]>=x0[k]) & (y1[js]>=y0[k])]
+        i = int(order[k])
+        pairs.extend((min(i, j), max(i, j)) for j in order[js].tolist())
+
+    pairs.sort()
+    return pairs
+
+
 
 # -------------------------------------------------------------------------------------------
 # Implementation of solving Rectangle-Intersection Problem according to algorithm proposed in
@@ -193,7 +286,7 @@ def _report_pair(i:int, j:int, index_groups:list):
 # - Recursive X-Y Cut using Bounding Boxes of Connected Components by Jaekyu Ha, 
 #   Robert M.Haralick and Ihsin T. Phillips
 # -------------------------------------------------------------------------------------------
-def recursive_xy_cut(img_binary:np.array, 
+def recursive_xy_cut(img_binary:'np.array', 
                     min_w:float=0.0, min_h:float=0.0, 
                     min_dx:float=15.0, min_dy:float=15.0): 
     '''Split image with recursive xy-cut algorithm.
@@ -208,7 +301,9 @@ def recursive_xy_cut(img_binary:np.array,
     Returns:
         list: bbox (x0, y0, x1, y1) of split blocks.
     '''
-    def xy_cut(arr:np.array, top_left:tuple, res:list, 
+    import numpy as np
+
+    def xy_cut(arr:'np.array', top_left:tuple, res:list, 
                     min_w:float, min_h:float, min_dx:float, min_dy:float):
         x0, y0 = top_left
         h, w = arr.shape
@@ -244,7 +339,7 @@ def recursive_xy_cut(img_binary:np.array,
     return res
 
 
-def _split_projection_profile(arr_values:np.array, min_value:float, min_gap:float):
+def _split_projection_profile(arr_values:'np.array', min_value:float, min_gap:float):
     '''Split projection profile:
 
     ```
@@ -265,6 +360,8 @@ def _split_projection_profile(arr_values:np.array, min_value:float, min_gap:floa
     Returns:
         tuple: Start indexes and end indexes of split groups.
     '''
+    import numpy as np
+
     # all indexes with projection height exceeding the threshold
     arr_index = np.where(arr_values>min_value)[0]
     if not len(arr_index): return
@@ -286,7 +383,7 @@ def _split_projection_profile(arr_values:np.array, min_value:float, min_gap:floa
     return arr_start, arr_end
 
 
-def inner_contours(img_binary:np.array, bbox:tuple, min_w:float, min_h:float):
+def inner_contours(img_binary:'np.array', bbox:tuple, min_w:float, min_h:float):
     '''Inner contours of current region, especially level 2 contours of the default opencv tree hirerachy.
 
     Args:
@@ -298,6 +395,8 @@ def inner_contours(img_binary:np.array, bbox:tuple, min_w:float, min_h:float):
     Returns:
         list: A list of bbox-es of inner contours.
     '''
+    import numpy as np
+    import cv2 as cv
     
     # find both external and inner contours of current region
     x0, y0, x1, y1 = bbox
@@ -352,7 +451,7 @@ def inner_contours(img_binary:np.array, bbox:tuple, min_w:float, min_h:float):
     return res
 
 
-def xy_project_profile(img_source:np.array, img_binary:np.array, gap:int=5, dw:int=None, dh:int=None):   
+def xy_project_profile(img_source:'np.array', img_binary:'np.array', gap:int=5, dw:int=None, dh:int=None):   
     '''Projection profile along x and y direction.
 
     ```
@@ -378,6 +477,8 @@ def xy_project_profile(img_source:np.array, img_binary:np.array, gap:int=5, dw:i
     Returns:
         np.array: The combined graph data.
     '''
+    import numpy as np
+
     # combined image
     h, w = img_binary.shape
     dh = dh or max(int(h/3), 15)
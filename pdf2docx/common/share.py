@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from enum import Enum
 import random
+from functools import lru_cache
 from collections.abc import Iterable
 from fitz.utils import getColorList, getColorInfoList
 
@@ -25,6 +26,22 @@ class RectType(Enum):
     SHADING = 1<<5
 
 
+class PageType(Enum):
+    '''Page type classified by a pre-scan of page contents.
+
+    * TEXT    : no vector paths, i.e. text and images only
+    * TABULAR : vector paths with mostly straight segments, e.g. table borders and shadings
+    * VECTOR  : vector paths with mostly curves, e.g. charts and drawings
+    * SCANNED : no text or vector paths, but images covering the page
+    * UNKNOWN : contents can't be decided, e.g. drawn by annotations
+    '''
+    UNKNOWN = -1
+    TEXT    = 0
+    TABULAR = 1
+    VECTOR  = 2
+    SCANNED = 3
+
+
 class TextDirection(Enum):
     '''Text direction.    
     * LEFT_RIGHT: from left to right within a line, and lines go from top to bottom
@@ -124,16 +141,20 @@ def lower_round(number:float, ndigits:int=0):
 # -------------------------
 # color methods
 # -------------------------
+@lru_cache(maxsize=1)
+def _named_colors():
+    '''fitz predefined colors, e.g. {'RED': (1.0,0.0,0.0)}; built once since it's costly.'''
+    names = getColorList()
+    return {name: (c[1] / 255.0, c[2] / 255.0, c[3] / 255.0) \
+                for name, c in zip(names, getColorInfoList())}, names
+
+
 def rgb_component_from_name(name:str=''):
     '''Get a named RGB color (or random color) from fitz predefined colors, e.g. 'red' -> (1.0,0.0,0.0).'''
-    # get color index
-    if name and name.upper() in getColorList():
-        pos = getColorList().index(name.upper())
-    else:
-        pos = random.randint(0, len(getColorList())-1)
-        
-    c = getColorInfoList()[pos]
-    return (c[1] / 255.0, c[2] / 255.0, c[3] / 255.0)
+    colors, names = _named_colors()
+    if name and name.upper() in colors:
+        return colors[name.upper()]
+    return colors[random.choice(names)]
 
 
 def rgb_component(srgb:int):
@@ -218,7 +239,9 @@ def debug_plot(title:str, show=True):
     .. note::
         Prerequisite of the inner function: 
             - the first argument is a :py:class:`~pdf2docx.page.BasePage` instance.
-            - the last argument is configuration parameters in ``dict`` type.
+            - the last argument is configuration parameters in ``dict`` type, with
+              ``debug_session`` (:py:class:`~pdf2docx.common.DebugSession.DebugSession`)
+              collecting the plots.
     '''
     def wrapper(func):
         def inner(*args, **kwargs):
@@ -228,17 +251,13 @@ def debug_plot(title:str, show=True):
             # check if plot page
             page = args[0] # BasePage object
             debug = kwargs.get('debug', False)
-            doc = kwargs.get('debug_doc', None)
-            filename = kwargs.get('debug_filename', None)
+            session = kwargs.get('debug_session', None)
 
-            if show and objects and debug and doc is not None:                
-                # create a new page
-                debug_page = new_page(doc, page.width, page.height, title)
-                # plot objects, e.g. text blocks, shapes, tables...
-                objects.plot(debug_page)
-                doc.save(filename)
+            if show and objects and debug and session is not None \
+                and session.accept(getattr(page, 'id', None)):
+                # plot objects, e.g. text blocks, shapes, tables... on a new page
+                session.plot(objects, page.width, page.height, title)
 
             return objects
         return inner
     return wrapper
-
@@ -2,27 +2,28 @@
 import json
 import logging
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Pool, cpu_count
 from time import perf_counter
 from typing import AnyStr, IO, Union
 
 import fitz
-from docx import Document
 
 from .page.Page import Page
-from .page.Pages import Pages
+from .page.Pages import (Pages, fallback_modes)
+from .page.PageBudget import (PageBudget, PageBudgetExceeded)
+from .common.DebugSession import DebugSession
 from .text.TextBlock import TextBlock
-from collections import Counter
+from .common.share import PageType
+from collections import (Counter, deque)
+from contextlib import nullcontext
 
 # check PyMuPDF>=1.19.x
 if list(map(int, fitz.VersionBind.split("."))) < [1, 19, 0]:
     raise SystemExit("PyMuPDF>=1.19.0 is required for pdf2docx.")
 
-# logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(levelname)s] %(message)s")
-
 
 class Converter:
     '''The ``PDF`` to ``docx`` converter.
@@ -48,6 +49,7 @@ class Converter:
         # fitz object
         self.filename_pdf = pdf_file
         self.password = str(password or "")
+        self._stream = stream
 
         if not pdf_file and not stream:
             raise ValueError("Either pdf_file or stream must be given.")
@@ -61,6 +63,9 @@ class Converter:
         # initialize empty pages container
         self._pages = Pages()
 
+        # background thread plotting parsed layout
+        self._layout_thread = None
+
     @property
     def fitz_doc(self): return self._fitz_doc    
 
@@ -68,7 +73,9 @@ class Converter:
     def pages(self): return self._pages
 
 
-    def close(self): self._fitz_doc.close()
+    def close(self):
+        if self._layout_thread: self._layout_thread.join()
+        self._fitz_doc.close()
 
 
     @property
@@ -76,11 +83,24 @@ class Converter:
         '''Default parsing parameters.'''
         return {
             'debug'                          : False,  # plot layout if True
-            'ocr'                            : 0,      # ocr status: 0 - no ocr; 1 - to do ocr; 2 - ocr-ed pdf
+            'debug_pdf'                      : None,   # plot layout of parsing stages to this pdf file in debug mode
+            'debug_pages'                    : None,   # indexes of pages to plot in debug mode; None - all parsed pages
+            'layout_pdf'                     : None,   # plot parsed layout to this pdf file in background if specified
+            'ocr'                            : 0,      # ocr status: 0 - no ocr; 1 - to do ocr on scanned pages; 2 - ocr-ed pdf
+            'ocr_engine'                     : 'tesseract', # ocr engine name registered in OCREngineFactory, or OCREngine subclass
+            'ocr_options'                    : None,   # options to initialize ocr engine, e.g. {'language': 'eng+chi_sim'}
+            'ocr_resolution'                 : 300,    # resolution (dpi) of page images to recognize
+            'ocr_workers'                    : 0,      # count of ocr processes; 0 - cpu count
+            'ocr_batch_size'                 : 4,      # count of page images recognized in one ocr task
+            'ocr_cache_dir'                  : None,   # cache ocr results by page image hash in this folder; None - in memory only
             'ignore_page_error'              : True,   # not break the conversion process due to failure of a certain page if True
             'multi_processing'               : False,  # convert pages with multi-processing if True
-            'cpu_count'                      : 0,      # working cpu count when convert pages with multi-processing
+            'multi_threading'                : False,  # parse pages with a thread pool if True, e.g. small documents or in web server
+            'pipeline'                       : False,  # extract, parse and create pages concurrently in a pipeline if True
+            'pipeline_lookahead'             : 2,      # count of parsed pages before and after a page to detect its header/footer in pipeline mode
+            'cpu_count'                      : 0,      # working cpu count when convert pages with multi-processing or multi-threading
             'min_section_height'             : 20.0,   # The minimum height of a valid section.
+            'section_detection'              : 'group', # detect section rows/columns: group - check elements pairwise; projection - by gaps of projection profile
             'connected_border_tolerance'     : 0.5,    # two borders are intersected if the gap lower than this value
             'max_border_width'               : 6.0,    # max border width
             'min_border_clearance'           : 2.0,    # the minimum allowable clearance of two borders
@@ -105,7 +125,10 @@ class Converter:
             'extract_stream_table'           : False,  # don't consider stream table when extracting tables
             'parse_lattice_table'            : True,   # whether parse lattice table or not; may destroy the layout if set False
             'parse_stream_table'             : True,   # whether parse stream table or not; may destroy the layout if set False
-            'delete_end_line_hyphen'         : False   # delete hyphen at the end of a line
+            'delete_end_line_hyphen'         : False,  # delete hyphen at the end of a line
+            'page_cpu_budget'                : 0,      # CPU time (seconds) to parse a page, fall back to cheap mode if exceeded; 0 - no limit
+            'page_memory_budget'             : 0,      # memory increment (MB) to parse a page, fall back to cheap mode if exceeded; 0 - no limit
+            'page_fallback'                  : ('no_stream_table', 'text') # fallback modes in order: no_stream_table, text, raster
         }
 
     # -----------------------------------------------------------------------
@@ -126,22 +149,59 @@ class Converter:
         '''
         return self.load_pages(start, end, pages) \
             .parse_document(**kwargs) \
-            .parse_pages(**kwargs) \
-            .print_document()
+            .parse_pages(**kwargs)
+
+    def print_document(self, filename:str, data:dict=None):
+        '''Plot parsed layout, e.g. sections and blocks, onto a copy of the source pdf for
+        debug purpose. The parsed pages and source pdf are kept unchanged.
+
+        Args:
+            filename (str): New pdf file to write.
+            data (dict, optional): Parsed layout in format of :py:meth:`store`.
+                Defaults to None, i.e. the parsed pages.
+        '''
+        if data is None:
+            data = {'pages': [page.store() for page in self._pages if page.finalized]}
+
+        # open source pdf independently, so that it's safe to plot in a background thread
+        doc = fitz.Document(stream=self._stream) if self._stream else fitz.Document(self.filename_pdf)
+        if doc.needs_pass: doc.authenticate(self.password)
+
+        # restore pages from stored layout
+        pages = Pages([Page(id=i, skip_parsing=True) for i in range(len(doc))])
+        for raw_page in data.get('pages', []):
+            pages[raw_page['id']].restore(raw_page)
+        pages.extract_header_footer()
 
-    def print_document(self):
-        self._pages.extract_header_footer()
         prev_color = None
-        for i, (page, raw_page) in enumerate(zip(self._pages, self._fitz_doc.pages())):
+        for i, (page, raw_page) in enumerate(zip(pages, doc.pages())):
             if not page.finalized: continue
-            if i < len(self._pages) - 1 and page.is_continuous_with_page(self._pages[i + 1]):
+            if i < len(pages) - 1 and page.is_continuous_with_page(pages[i + 1]):
                 prev_color = page.plot(raw_page, prev_color)
             else:
                 page.plot(raw_page, prev_color)
                 prev_color = None
-        self._fitz_doc.save("output.pdf")
+        doc.save(filename)
+        doc.close()
         return self
 
+    def _print_document_in_background(self, filename:str):
+        '''Plot parsed layout in a background thread, which is joined when closing converter.
+
+        .. note::
+            The parsed layout is stored in current thread, since the parsed pages are still used
+            when making docx, while plotting works on the snapshot only.
+        '''
+        if not filename: return
+        data = {'pages': [page.store() for page in self._pages if page.finalized]}
+        def target():
+            try:
+                self.print_document(filename, data)
+            except Exception as e:
+                logging.error('Failed to plot layout to %s: %s', filename, e)
+        self._layout_thread = threading.Thread(target=target, name='pdf2docx-layout')
+        self._layout_thread.start()
+
     def load_pages(self, start: int = 0, end: int = None, pages: list = None):
         '''Step 1 of converting process: open PDF file with ``PyMuPDF``, 
         especially for password encrypted file.
@@ -188,19 +248,96 @@ class Converter:
 
         pages = [page for page in self._pages if not page.skip_parsing]
         num_pages = len(pages)
-        for i, page in enumerate(pages, start=1):
-            pid = page.id + 1
-            logging.info('(%d/%d) Page %d', i, num_pages, pid)
-            try:
-                page.parse(**kwargs)
-            except Exception as e:
-                if not kwargs['debug'] and kwargs['ignore_page_error']:
-                    logging.error('Ignore page %d due to parsing page error: %s', pid, e)
-                else:
-                    raise ConversionException(f'Error when parsing page {pid}: {e}')
+
+        # parse pages in a thread pool: page layouts are independent of each other, while
+        # plotting debug layout goes one page by one page
+        concurrent = kwargs['multi_threading'] and not kwargs['debug'] and num_pages>1
+
+        if concurrent: kwargs = self._concurrent_settings(kwargs)
+        parse = lambda i, page: self._parse_page_safely(page, i, num_pages, **kwargs)
+
+        if concurrent:
+            cpu = min(kwargs['cpu_count'], cpu_count()) if kwargs['cpu_count'] else cpu_count()
+            with ThreadPoolExecutor(min(cpu, num_pages), thread_name_prefix='pdf2docx-page') as executor:
+                list(executor.map(parse, range(1, num_pages+1), pages))
+        else:
+            for i, page in enumerate(pages, start=1): parse(i, page)
+
         return self
 
 
+    @staticmethod
+    def _concurrent_settings(settings:dict):
+        '''Settings for pages parsed concurrently: memory is counted for the whole process, so
+        it's not a budget of any single page and is ignored with a warning.'''
+        if not settings['page_memory_budget']: return settings
+        logging.warning('Page memory budget is ignored when parsing pages concurrently.')
+        return dict(settings, page_memory_budget=0)
+
+
+    def _parse_page_safely(self, page:Page, i:int, num_pages:int, **kwargs):
+        '''Parse the i-th page of ``num_pages`` pages, and ignore the error if allowed.'''
+        pid = page.id + 1
+        logging.info('(%d/%d) Page %d', i, num_pages, pid)
+        try:
+            self._parse_page(page, **kwargs)
+        except Exception as e:
+            if not kwargs['debug'] and kwargs['ignore_page_error']:
+                logging.error('Ignore page %d due to parsing page error: %s', pid, e)
+            else:
+                raise ConversionException(f'Error when parsing page {pid}: {e}')
+
+
+    def _parse_page(self, page:Page, **kwargs):
+        '''Parse page within the budget; otherwise, fall back to cheap modes in turn.
+
+        * ``no_stream_table``: extract page again and parse without stream tables
+        * ``text``: plain text only, without any image, shape or table
+        * ``raster``: the entire page as an image
+
+        The last fallback mode runs without budget.
+        '''
+        # already fall back when extracting page
+        if page.fallback:
+            page.parse(**self._fallback_settings(page.fallback, kwargs))
+            return
+
+        budget = PageBudget.from_settings(kwargs)
+        try:
+            with budget: page.parse(**self._routed_settings(page.page_type, kwargs))
+            return
+        except PageBudgetExceeded as e:
+            error = e
+
+        modes = fallback_modes(kwargs)
+        for i, mode in enumerate(modes, start=1):
+            logging.warning('Page %d falls back to "%s" mode: %s', page.id+1, mode, error)
+            settings = self._fallback_settings(mode, kwargs)
+            try:
+                with (budget if i<len(modes) else nullcontext()):
+                    self._pages.fallback(page, self._fitz_doc, mode, **kwargs)
+                    page.parse(**settings)
+                break
+            except PageBudgetExceeded as e:
+                error = e
+
+
+    @staticmethod
+    def _routed_settings(page_type:PageType, settings:dict):
+        '''Parsing parameters for page type, e.g. no lattice table without any path.'''
+        if page_type in (PageType.TEXT, PageType.SCANNED):
+            settings = dict(settings, parse_lattice_table=False)
+        return settings
+
+
+    @staticmethod
+    def _fallback_settings(mode:str, settings:dict):
+        '''Parsing parameters for fallback mode.'''
+        settings = dict(settings, parse_stream_table=False)
+        if mode in ('text', 'raster'): settings['parse_lattice_table'] = False
+        return settings
+
+
     def make_docx(self, docx_filename=None, **kwargs):
         '''Step 4 of converting process: create docx file with converted pages.
         
@@ -217,6 +354,18 @@ class Converter:
         if not parsed_pages:
             raise ConversionException('No parsed pages. Please parse page first.')
 
+        self._make_docx(docx_filename, parsed_pages, len(parsed_pages), **kwargs)
+
+
+    def _make_docx(self, docx_filename, pages, num_pages:int, **kwargs):
+        '''Create docx file page by page.
+
+        Args:
+            docx_filename (str, file-like): docx file to write.
+            pages (iterable): Parsed pages, e.g. a list or a generator.
+            num_pages (int): Count of pages.
+            kwargs (dict, optional): Configuration parameters.
+        '''
         if not docx_filename:
             raise ConversionException(
                 "No docx file name. Please specify a docx file name or a file-like object to write."
@@ -230,11 +379,13 @@ class Converter:
             filename = docx_filename or f'{self.filename_pdf[0:-len(".pdf")]}.docx' if self.filename_pdf else "output.docx"
             if os.path.exists(filename): os.remove(filename)
 
-        # create page by page        
+        # create page by page
+        from docx import Document
         docx_file = Document() 
-        num_pages = len(parsed_pages)
-        for i, page in enumerate(parsed_pages, start=1):
+        parsed = False
+        for i, page in enumerate(pages, start=1):
             if not page.finalized: continue # ignore unparsed pages
+            parsed = True
             pid = page.id + 1
             logging.info('(%d/%d) Page %d', i, num_pages, pid)
             try:
@@ -246,6 +397,8 @@ class Converter:
                     raise MakedocxException(f'Error when make page {pid}: {e}')
 
         # save docx
+        if not parsed:
+            raise ConversionException('No parsed pages. Please parse page first.')
         docx_file.save(filename)
 
 
@@ -302,15 +455,13 @@ class Converter:
             layout_file (str): New json file storing parsed layout data. Default to ``layout.json``.
         '''
         # include debug information
-        # fitz object in debug mode: plot page layout
         # file path for this debug pdf: demo.pdf -> debug_demo.pdf
         path, filename = os.path.split(self.filename_pdf)
         if not debug_pdf: debug_pdf = os.path.join(path, f'debug_{filename}')
         if not layout_file: layout_file  = os.path.join(path, 'layout.json')
         kwargs.update({
-            'debug'         : True,
-            'debug_doc'     : fitz.Document(),
-            'debug_filename': debug_pdf
+            'debug'    : True,
+            'debug_pdf': debug_pdf
         })
 
         # parse and create docx
@@ -347,6 +498,11 @@ class Converter:
 
         .. note::
             Multi-processing works only for continuous pages specified by ``start`` and ``end`` only.
+
+        .. note::
+            Multi-threading parses pages in a thread pool after analyzing the whole document, which
+            avoids starting processes but benefits only if the GIL is released, e.g. free-threaded
+            Python. Page memory budget is ignored in this mode.
         """
         t0 = perf_counter()
         logging.info('Start to convert %s', self.filename_pdf)
@@ -361,8 +517,24 @@ class Converter:
         # convert page by page
         if settings['multi_processing']:
             self._convert_with_multi_processing(docx_filename, start, end, **settings)
+            self._print_document_in_background(settings['layout_pdf'])
         else:
-            self.parse(start, end, pages, **settings).make_docx(docx_filename, **settings)
+            # plot parsing stages to one debug pdf, written once at the end
+            session = None
+            if settings['debug'] and settings['debug_pdf'] and not settings.get('debug_session'):
+                session = DebugSession(settings['debug_pdf'], settings['debug_pages'])
+                settings['debug_session'] = session
+            try:
+                # stages of pipeline run in threads, while debug layout is plotted in sequence
+                if settings['pipeline'] and not settings['debug']:
+                    self._convert_with_pipeline(docx_filename, start, end, pages, **settings)
+                    self._print_document_in_background(settings['layout_pdf'])
+                else:
+                    self.parse(start, end, pages, **settings)
+                    self._print_document_in_background(settings['layout_pdf'])
+                    self.make_docx(docx_filename, **settings)
+            finally:
+                if session: session.close()
 
         logging.info('Terminated in %.2fs.', perf_counter()-t0)        
 
@@ -392,6 +564,87 @@ class Converter:
         return tables
 
     
+    def _convert_with_pipeline(self, docx_filename, start:int, end:int, pages:list, **kwargs):
+        '''Convert pages in a pipeline, where the following stages run concurrently and process
+        pages in order:
+
+        * extract and clean up pages with ``PyMuPDF`` in a background thread;
+        * analyze and parse each extracted page in current thread, then detect header/footer of
+          the page with a look-ahead window, i.e. ``pipeline_lookahead`` parsed pages before and
+          after it;
+        * create docx pages in another background thread.
+
+        The queue between extracting and parsing is bounded, which limits the count of
+        extracted pages in memory as well. Page memory budget is ignored in this mode, since
+        memory is counted for the whole process running all stages.
+
+        .. note::
+            Header/footer is detected from the pages in window rather than the whole document,
+            which is same to :py:meth:`parse` if ``pipeline_lookahead`` covers all pages.
+        '''
+        self.load_pages(start, end, pages)
+        logging.info(self._color_output('[2/4] Analyzing document and parsing pages in pipeline...'))
+        self._pages.prepare(self._fitz_doc, **kwargs)
+
+        kwargs = self._concurrent_settings(kwargs)
+        pages = [page for page in self._pages if not page.skip_parsing]
+        num_pages = len(pages)
+        raw_queue = queue.Queue(maxsize=2) # extract at most two pages ahead of parsing
+        docx_queue = queue.Queue()
+
+        # look-ahead window: released pages before current page are kept for comparison only
+        lookahead = max(int(kwargs['pipeline_lookahead']), 0)
+        released, pending = deque(maxlen=lookahead), deque()
+        def release():
+            page = pending.popleft()
+            self._pages.extract_header_footer([*released, page, *pending], targets=[page])
+            released.append(page)
+            docx_queue.put(page)
+        stop, abort = threading.Event(), object()
+
+        def put(item):
+            # stop waiting for the full queue once parsing stage fails
+            while not stop.is_set():
+                try:
+                    return raw_queue.put(item, timeout=0.1)
+                except queue.Full:
+                    pass
+
+        def extract():
+            try:
+                for page in pages:
+                    if stop.is_set(): break
+                    put((page, self._pages.extract_page(page, self._fitz_doc, **kwargs)))
+            finally:
+                put(None)
+
+        def parsed_pages():
+            for page in iter(docx_queue.get, None):
+                if page is abort: raise ConversionException('Pipeline is aborted.')
+                yield page
+
+        with ThreadPoolExecutor(2, thread_name_prefix='pdf2docx-pipeline') as executor:
+            extracting = executor.submit(extract)
+            making = executor.submit(self._make_docx, docx_filename, parsed_pages(), num_pages, **kwargs)
+            try:
+                analyzed = self._pages.analyze_pages(iter(raw_queue.get, None), self._fitz_doc, **kwargs)
+                for i, page in enumerate(analyzed, start=1):
+                    self._parse_page_safely(page, i, num_pages, **kwargs)
+                    pending.append(page)
+                    if len(pending) > lookahead: release()
+                    if making.done(): making.result() # raise error of making docx in time
+                extracting.result() # raise error of extracting pages
+                while pending: release()
+                docx_queue.put(None)
+            except BaseException:
+                stop.set()
+                docx_queue.put(abort)
+                raise
+            making.result()
+
+        self._pages.check_words()
+
+
     def _convert_with_multi_processing(self, docx_filename:str, start:int, end:int, **kwargs):
         '''Parse and create pages based on page indexes with multi-processing.
 
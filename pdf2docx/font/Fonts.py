@@ -22,7 +22,6 @@ but more generic properties are required further:
 import os
 from io import BytesIO
 from collections import namedtuple 
-from fontTools.ttLib import TTFont
 from ..common.Collection import BaseCollection
 from ..common.constants import (CJK_CODEPAGE_BITS, CJK_UNICODE_RANGE_BITS, CJK_UNICODE_RANGES)
 
@@ -78,6 +77,7 @@ class Fonts(BaseCollection):
                 assert ext not in ('n/a', 'cff'), "base font or not supported font"
 
                 # try to get more font metrics with fonttool
+                from fontTools.ttLib import TTFont
                 tt = TTFont(BytesIO(buffer))
                 name = cls.get_font_family_name(tt)
                 line_height = cls.get_line_height_factor(tt)
@@ -105,7 +105,7 @@ class Fonts(BaseCollection):
 
     
     @staticmethod
-    def get_font_family_name(tt_font:TTFont):
+    def get_font_family_name(tt_font:'TTFont'):
         '''Get the font family name from the font's names table.
 
         https://gist.github.com/pklaus/dce37521579513c574d0
@@ -132,7 +132,7 @@ class Fonts(BaseCollection):
 
 
     @staticmethod
-    def get_line_height_factor(tt_font:TTFont):
+    def get_line_height_factor(tt_font:'TTFont'):
         '''Calculate line height ratio based on ``hhea`` and ``OS/2`` tables.
 
         Fon non-CJK fonts::
@@ -189,7 +189,7 @@ class Fonts(BaseCollection):
     
 
     @staticmethod
-    def is_cjk_font(tt_font:TTFont):
+    def is_cjk_font(tt_font:'TTFont'):
         '''Test font object to confirm that it meets our definition of a CJK font file.
 
         The definition is met if any of the following conditions are True:
@@ -20,7 +20,6 @@ Data structure defined in link https://pymupdf.readthedocs.io/en/latest/textpage
 
 import base64
 from io import BytesIO
-from ..common import docx
 from ..common.Element import Element
 
 
@@ -90,5 +89,7 @@ class Image(Element):
 
     def make_docx(self, paragraph):
         '''Add image span to a docx paragraph.'''
+        from ..common import docx
+
         # add image
         docx.add_image(paragraph, BytesIO(self.image), self.bbox.x1-self.bbox.x0, self.bbox.y1-self.bbox.y0)
\ No newline at end of file
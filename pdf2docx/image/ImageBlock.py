@@ -11,7 +11,6 @@ from ..text.TextBlock import TextBlock
 from .Image import Image
 from .ImageSpan import ImageSpan
 from ..common.Block import Block
-from ..common.docx import add_float_image
 
 
 class ImageBlock(Image, Block):
@@ -73,6 +72,8 @@ class ImageBlock(Image, Block):
         .. note::
             Inline image is created within TextBlock.
         '''
+        from ..common.docx import add_float_image
+
         if self.is_float_image_block:
             x0, y0, x1, y1 = self.bbox
             add_float_image(p, BytesIO(self.image), width=x1-x0, pos_x=x0, pos_y=y0)
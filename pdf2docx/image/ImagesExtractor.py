@@ -14,7 +14,8 @@ import logging
 import fitz
 from ..common.Collection import Collection
 from ..common.share import BlockType
-from ..common.algorithm import (recursive_xy_cut, inner_contours, xy_project_profile)
+from ..common.algorithm import (recursive_xy_cut, inner_contours, xy_project_profile, intersected_pairs)
+from ..page.PageBudget import check_budget
 
 
 class ImagesExtractor:
@@ -25,6 +26,7 @@ class ImagesExtractor:
             page (fitz.Page): pdf page to extract images.
         '''
         self._page = page
+        self._display_list = None # display list of page without text, shared by all clippings
     
 
     def clip_page_to_pixmap(self, bbox:fitz.Rect=None, zoom:float=3.0):
@@ -39,9 +41,6 @@ class ImagesExtractor:
         Returns:
             fitz.Pixmap: The extracted pixmap.
         '''        
-        # hide text 
-        self._hide_page_text(self._page)
-        
         if bbox is None:
             clip_bbox = self._page.rect
         
@@ -59,7 +58,23 @@ class ImagesExtractor:
         # - https://github.com/pymupdf/PyMuPDF/issues/181
         matrix = fitz.Matrix(zoom, zoom)
 
-        return self._page.get_pixmap(clip=clip_bbox, matrix=matrix) # type: fitz.Pixmap
+        return self.display_list.get_pixmap(matrix=matrix, colorspace=fitz.csRGB, clip=clip_bbox) # type: fitz.Pixmap
+
+
+    @property
+    def display_list(self):
+        '''Display list of page without text. The page content is interpreted once when 
+        it is first used, and then shared by all clippings, e.g. svg contours detection and 
+        clipping each image.
+        '''
+        if self._display_list is None:
+            streams = self._hide_page_text(self._page)
+            try:
+                self._display_list = self._page.get_displaylist()
+            finally:
+                # restore page contents, e.g. for extracting page again in fallback mode
+                self._restore_streams(self._page.parent, streams)
+        return self._display_list
 
 
     def clip_page_to_dict(self, bbox:fitz.Rect=None, clip_image_res_ratio:float=3.0):
@@ -99,15 +114,16 @@ class ImagesExtractor:
 
         # step 1: collect images: [(bbox, item), ..., ]
         ic = Collection()
-        for item in self._page.get_images(full=True):
+        items = self._page.get_images(full=True)
+        image_rects = self._image_rects(items)
+        unrotated_page_bbox = self._page.cropbox # note the difference to page.rect
+        for item in items:
             # image item: (xref, smask, width, height, bpc, colorspace, ...)
             item = list(item)
             item[-1] = 0            
             
             # find all occurrences referenced to this image            
-            rects = self._page.get_image_rects(item)
-            unrotated_page_bbox = self._page.cropbox # note the difference to page.rect
-            for bbox in rects:
+            for bbox in image_rects[item[0]]:
                 # ignore small images
                 if bbox.get_area()<=4: continue
 
@@ -117,9 +133,10 @@ class ImagesExtractor:
                 # collect images
                 ic.append((bbox, item))
 
-        # step 2: group by intersection
+        # step 2: group by intersection, checking only pairs with bbox intersected
         fun = lambda a, b: a[0].intersects(b[0])
-        groups = ic.group(fun)
+        pairs = intersected_pairs([bbox for bbox, _ in ic]) if ic else []
+        groups = ic.group(fun, pairs)
 
         # step 3: check each group
         images = []
@@ -180,7 +197,10 @@ class ImagesExtractor:
         external_bboxes = recursive_xy_cut(binary, min_dx=min_svg_gap_dx, min_dy=min_svg_gap_dy)        
         
         # inner contours
-        grouped_inner_bboxes = [inner_contours(binary, bbox, min_w, min_h) for bbox in external_bboxes]
+        grouped_inner_bboxes = []
+        for bbox in external_bboxes:
+            check_budget()
+            grouped_inner_bboxes.append(inner_contours(binary, bbox, min_w, min_h))
 
         # combined external and inner contours
         groups = list(zip(external_bboxes, grouped_inner_bboxes))
@@ -275,9 +295,32 @@ class ImagesExtractor:
         return im_png.tobytes()
 
 
+    def _image_rects(self, items:list):
+        '''Find all occurrences of page images in one pass, i.e. an equivalent of calling
+        ``Page.get_image_rects()`` for each image, which scans all page images every time.
+
+        Args:
+            items (list): Image items of ``Page.get_images()``.
+
+        Returns:
+            dict: Image xref to a list of ``fitz.Rect`` occurrences.
+        '''
+        # image placements are identified by the MD5 digest of image content
+        rects = {}
+        for info in self._page.get_image_info(hashes=True):
+            rects.setdefault(info['digest'], []).append(fitz.Rect(info['bbox']))
+
+        doc = self._page.parent
+        return {item[0]: rects.get(fitz.Pixmap(doc, item[0]).digest, []) for item in items}
+
+
     @staticmethod
     def _hide_page_text(page:fitz.Page):
-        '''Hide page text before clipping page.'''
+        '''Hide page text before clipping page.
+
+        Returns:
+            dict: Original streams ``{xref: stream}`` to restore with ``_restore_streams()``.
+        '''
         # NOTE: text might exist in both content stream and form object stream
         # - content stream, i.e. direct page content
         # - form object, i.e. contents referenced by this page
@@ -290,11 +333,20 @@ class ImagesExtractor:
         # - https://github.com/pymupdf/PyMuPDF/issues/257
         # - https://www.adobe.com/content/dam/acom/en/devnet/pdf/pdfs/pdf_reference_archives/PDFReference.pdf
         doc = page.parent # type: fitz.Document
+        streams = {}
         for xref in xref_list:
-            stream = doc.xref_stream(xref).replace(b'BT', b'BT 3 Tr') \
-                                             .replace(b'Tm', b'Tm 3 Tr') \
-                                             .replace(b'Td', b'Td 3 Tr')
+            if xref in streams: continue
+            streams[xref] = doc.xref_stream(xref)
+            stream = streams[xref].replace(b'BT', b'BT 3 Tr') \
+                                  .replace(b'Tm', b'Tm 3 Tr') \
+                                  .replace(b'Td', b'Td 3 Tr')
             doc.update_stream(xref, stream)
+        return streams
+
+    @staticmethod
+    def _restore_streams(doc:fitz.Document, streams:dict):
+        '''Restore streams changed by ``_hide_page_text()``.'''
+        for xref, stream in streams.items(): doc.update_stream(xref, stream)
    
     @staticmethod
     def _recover_pixmap(doc:fitz.Document, item:list):
@@ -5,12 +5,11 @@ and a combination of ``Line`` and ``TableBlock`` during parsing process.
 '''
 
 import logging
-from docx.shared import Pt
 from ..common import constants
 from ..common.Collection import ElementCollection
+from ..common.algorithm import (IntervalIndex, intersected_pairs)
 from ..common.share import (BlockType, lower_round, rgb_value)
 from ..common.Block import Block
-from ..common.docx import (reset_paragraph_format, delete_paragraph)
 from ..text.TextBlock import TextBlock
 from ..text.TextSpan import TextSpan
 from ..text.Line import Line
@@ -145,10 +144,11 @@ class Blocks(ElementCollection):
         # delete redundant blanks
         for line in instances: line.strip()
 
-        # detect floating images
-        self.reset(instances) \
-            ._identify_floating_images(float_image_ignorable_gap) \
-            ._remove_overlapped_lines(line_overlap_threshold)
+        # detect floating images, then overlapped lines checking only the intersected pairs
+        self.reset(instances)
+        pairs = intersected_pairs([line.bbox for line in instances])
+        self._identify_floating_images(float_image_ignorable_gap) \
+            ._remove_overlapped_lines(line_overlap_threshold, pairs)
 
 
     def assign_to_tables(self, tables:list):
@@ -162,8 +162,14 @@ class Blocks(ElementCollection):
         # assign blocks to table region        
         blocks_in_tables = [[] for _ in tables] # type: list[list[Line|TableBlock]]
         blocks = []   # type: list[Line|TableBlock]
+        index = IntervalIndex([(table.bbox.y0, table.bbox.y1) for table in tables])
         for block in self._instances:
-            self._assign_block_to_tables(block, tables, blocks_in_tables, blocks)
+            # check only the tables overlapped in y-direction
+            indexes = index.query(block.bbox.y0, block.bbox.y1)
+            self._assign_block_to_tables(block, 
+                        [tables[i] for i in indexes], 
+                        [blocks_in_tables[i] for i in indexes], 
+                        blocks)
 
         # assign blocks to associated cells
         for table, blocks_in_table in zip(tables, blocks_in_tables):
@@ -275,9 +281,14 @@ class Blocks(ElementCollection):
             rects (Shapes): Potential styles applied on blocks.
             delete_end_line_hyphen (bool): delete hyphen at the end of a line if True.
         '''
+        # index shapes by y-range, so each block visits only the vertically overlapped ones
+        rects = list(rects)
+        index = IntervalIndex([(rect.bbox.y0, rect.bbox.y1) for rect in rects])
+
         # parse text block style one by one
         for block in filter(lambda e: e.is_text_block, self._instances): 
-            block.parse_text_format(rects)
+            indexes = index.query(block.bbox.y0, block.bbox.y1)
+            block.parse_text_format([rects[i] for i in indexes])
 
             # adjust word at the end of each line
             block.lines.adjust_last_word(delete_end_line_hyphen)
@@ -302,6 +313,9 @@ class Blocks(ElementCollection):
         Args:
             doc (Document, _Cell): The container to make docx content.
         '''
+        from docx.shared import Pt
+        from ..common.docx import (reset_paragraph_format, delete_paragraph)
+
         def make_table(table_block, pre_table):
             # create dummy paragraph if table before space is set
             # - a minimum line height of paragraph is 0.7pt, so ignore before space if less than this value
@@ -365,10 +379,17 @@ class Blocks(ElementCollection):
     # internal methods
     # ----------------------------------------------------------------------------------
     def _identify_floating_images(self, float_image_ignorable_gap:float):
-        '''Identify floating image lines and convert to ImageBlock.'''
+        '''Identify floating image lines and convert to ImageBlock.
+
+        .. note::
+            Lines are shrunk by the ignorable gap and grouped by the sweep-line rectangle
+            intersection, i.e. O(nlog n + k). A line thinner than twice the gap turns to an
+            inverted rect, whose connectivity depends on the other lines rather than any single
+            pair, so the candidate pairs of ``intersected_pairs`` are not used here.
+        '''
         # group lines by connectivity
         groups = self.group_by_connectivity(dx=-float_image_ignorable_gap, dy=-float_image_ignorable_gap)
-        
+
         # identify floating images
         for group in filter(lambda group: len(group)>1, groups):
             for line in filter(lambda line: line.image_spans, group):
@@ -381,22 +402,30 @@ class Blocks(ElementCollection):
 
         return self
 
-    def _remove_overlapped_lines(self, line_overlap_threshold:float):
+    def _remove_overlapped_lines(self, line_overlap_threshold:float, pairs:list):
         '''Delete overlapped lines. 
         NOTE: Don't run this method until floating images are excluded.
+
+        Args:
+            line_overlap_threshold (float): Delete line if the intersection exceeds this value.
+            pairs (list): Index pairs of intersected lines, refer to ``intersected_pairs``.
         '''
-        # group lines by overlap
+        # group lines by overlap, excluding floating images, i.e. lines with empty bbox already
+        valid = lambda i: not self._instances[i].bbox.is_empty
+        pairs = [(i, j) for i, j in pairs if valid(i) and valid(j)]
         fun = lambda a, b: a.get_main_bbox(b, threshold=line_overlap_threshold)
-        groups = self.group(fun)
+        groups = self.group(fun, pairs)
         
         # delete overlapped lines
+        num = 0
         for group in filter(lambda group: len(group)>1, groups):
             # keep only the line with largest area
             sorted_lines = sorted(group, key=lambda line: line.bbox.get_area())
             for line in sorted_lines[:-1]:
-                logging.warning('Ignore Line "%s" due to overlap', line.text)
                 line.update_bbox((0,0,0,0))
+                num += 1
 
+        if num: logging.warning('Ignore %d lines due to overlap.', num)
         return self
 
 
@@ -30,6 +30,7 @@ The page layout parsing idea:
 from ..text.Line import Line
 from ..common import constants
 from ..shape.Shapes import Shapes
+from ..page.PageBudget import check_budget
 
 
 class Layout:
@@ -109,9 +110,11 @@ class Layout:
 
         # parse tables
         self._parse_table(**settings)
+        check_budget()
 
         # parse paragraphs
         self._parse_paragraph(**settings)
+        check_budget()
 
         # parse sub-layout, i.e. cell layouts under table block
         for block in filter(lambda e: e.is_table_block, self.blocks):
@@ -142,7 +145,8 @@ class Layout:
                 settings['connected_border_tolerance'],
                 settings['min_border_clearance'],
                 settings['max_border_width'])
-        
+            check_budget()
+
         # parse table structure based on implicit layout of text blocks
         if settings['parse_stream_table']:
             self._table_parser.stream_tables(
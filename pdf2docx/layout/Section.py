@@ -20,8 +20,6 @@ to distinguish these different layouts.
     }
 '''
 
-from docx.enum.section import WD_SECTION
-from ..common.docx import set_columns
 from ..common.Collection import BaseCollection
 from .Column import Column
 
@@ -82,6 +80,9 @@ class Section(BaseCollection):
         Args:
             doc (Document): ``python-docx`` document object
         '''
+        from docx.enum.section import WD_SECTION
+        from ..common.docx import set_columns
+
         # set section column
         section = doc.sections[-1]
         width_list = [c.bbox[2]-c.bbox[0] for c in self]
@@ -3,10 +3,7 @@
 '''Collection of :py:class:`~pdf2docx.layout.Section` instances.
 '''
 
-from docx.enum.section import WD_SECTION
-from docx.shared import Pt
 from ..common.Collection import BaseCollection
-from ..common.docx import reset_paragraph_format
 from .Section import Section
 from ..common import constants
 from ..common.share import rgb_component_from_name
@@ -31,6 +28,10 @@ class Sections(BaseCollection):
 
     def make_docx(self, doc):
         '''Create sections in docx.'''
+        from docx.enum.section import WD_SECTION
+        from docx.shared import Pt
+        from ..common.docx import reset_paragraph_format
+
         if not self: return
 
         # mark paragraph index before creating current page
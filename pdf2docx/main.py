@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from .converter import Converter
 
 
 class PDF2DOCX:
@@ -31,6 +30,7 @@ class PDF2DOCX:
             if end: end -= 1
             if pages: pages = [i-1 for i in pages]
 
+        from .converter import Converter
         cv = Converter(pdf_file, password)
         try:
             cv.convert(docx_file, start, end, pages, **kwargs)
@@ -58,10 +58,41 @@ class PDF2DOCX:
             page = max(page-1, 0)
 
         # explode exception directly if debug mode
+        from .converter import Converter
         cv = Converter(pdf_file, password)
         cv.debug_page(page, docx_file, debug_pdf, layout_file, **kwargs)
         cv.close()
-            
+
+
+    @staticmethod
+    def plot(pdf_file:str, layout_file:str='layout.json', output_pdf:str=None, password:str=None):
+        '''Plot parsed layout stored in json file onto pdf pages, i.e. post-processing for debugging.
+
+        Args:
+            pdf_file (str) : PDF filename to read from.
+            layout_file (str, optional): Parsed layout data, e.g. created by ``debug`` command.
+                Defaults to ``layout.json``.
+            output_pdf (str, optional): New pdf file with layout plotted. Defaults to same name
+                with pdf file plus prefix ``layout_``.
+            password (str): Password for encrypted pdf. Default to None if not encrypted.
+        '''
+        import os, json
+        if not output_pdf:
+            path, filename = os.path.split(pdf_file)
+            output_pdf = os.path.join(path, f'layout_{filename}')
+
+        with open(layout_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        from .converter import Converter
+        cv = Converter(pdf_file, password)
+        try:
+            cv.print_document(output_pdf, data)
+        except Exception as e:
+            logging.error(e)
+        finally:
+            cv.close()
+
 
 
     @staticmethod
@@ -82,6 +113,7 @@ class PDF2DOCX:
             if end: end -= 1
             if pages: pages = [i-1 for i in pages]
         
+        from .converter import Converter
         cv = Converter(pdf_file, password)
         try:
             tables = cv.extract_tables(start, end, pages, **kwargs)
@@ -94,6 +126,51 @@ class PDF2DOCX:
         return tables
 
 
+    @staticmethod
+    def batch(source:str, output_dir:str=None, log_file:str=None, workers:int=0, resume:bool=True, password:str=None, **kwargs):
+        '''Convert pdf files in a directory, glob pattern or manifest file with a file-level process pool.
+
+        Args:
+            source (str): Directory, glob pattern or manifest file (one pdf path per line).
+            output_dir (str, optional): Folder to write docx files. Defaults to same folder with pdf file.
+            log_file (str, optional): JSONL status log. Defaults to ``pdf2docx-batch.jsonl`` under ``output_dir``.
+            workers (int, optional): Count of worker processes. Defaults to 0, i.e. cpu count.
+            resume (bool, optional): Skip files converted successfully in status log. Defaults to True.
+            password (str): Password for encrypted pdf. Default to None if not encrypted.
+            kwargs (dict) : Configuration parameters.
+
+        .. note::
+            Refer to :py:mod:`~pdf2docx.batch` for detailed description.
+        '''
+        from .batch import convert_batch
+        return convert_batch(source, output_dir, log_file, workers, resume, password, **kwargs)
+
+
+    @staticmethod
+    def serve(host:str='127.0.0.1', port:int=8000, unix_socket:str=None, workers:int=0, timeout:float=600.0, max_queue_size:int=0, max_body_size:int=100*1024*1024):
+        '''Start a conversion service with warm worker processes.
+
+        Args:
+            host (str, optional): Host to bind. Defaults to '127.0.0.1'.
+            port (int, optional): Port to bind. Defaults to 8000.
+            unix_socket (str, optional): Listen on Unix socket path instead of TCP port.
+            workers (int, optional): Count of worker processes. Defaults to 0, i.e. cpu count.
+            timeout (float, optional): Default timeout (seconds) of a conversion job. Defaults to 600.
+            max_queue_size (int, optional): Reject new jobs if queue is full. Defaults to 0, no limit.
+            max_body_size (int, optional): Reject requests with larger PDF (bytes). Defaults to 100MB.
+
+        .. note::
+            Refer to :py:mod:`~pdf2docx.service` for the HTTP API.
+        '''
+        import asyncio
+        from .service import ConversionService
+        service = ConversionService(workers, timeout, max_queue_size, max_body_size)
+        try:
+            asyncio.run(service.serve(host, port, unix_socket))
+        except KeyboardInterrupt:
+            pass
+
+
     @staticmethod
     def gui():
         '''Simple user interface.'''
@@ -109,6 +186,9 @@ parse = PDF2DOCX.convert
 
 def main():
     import fire
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(levelname)s] %(message)s")
     fire.Fire(PDF2DOCX)
 
 
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+'''Cache OCR results by the hash of page image and the signature of OCR engine.
+
+Results are cached in memory of current process, e.g. converting same document repeatedly in
+a service, and optionally in a folder with one JSON file per page image, so that rerunning the
+conversion costs no OCR at all.
+'''
+
+import os
+import json
+import hashlib
+import logging
+
+
+class OCRCache:
+    '''Recognized words of page images.'''
+
+    _MEMORY = {} # key -> words, shared in current process
+    MAX_MEMORY_ITEMS = 512 # drop the earliest cached results if exceeded
+
+    def __init__(self, cache_dir:str=None):
+        '''
+        Args:
+            cache_dir (str, optional): Folder to store results. Defaults to None, i.e. in memory only.
+        '''
+        self.cache_dir = cache_dir
+        if cache_dir: os.makedirs(cache_dir, exist_ok=True)
+
+
+    @staticmethod
+    def key(image:bytes, signature:str):
+        '''Cache key of page image recognized by the engine with given signature.'''
+        return f'{signature}-{hashlib.sha256(image).hexdigest()}'
+
+
+    def get(self, key:str):
+        '''Cached words, or None if not found.'''
+        words = OCRCache._MEMORY.get(key)
+        if words is not None or not self.cache_dir: return words
+
+        filename = os.path.join(self.cache_dir, f'{key}.json')
+        if not os.path.isfile(filename): return None
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                words = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning('Ignore broken OCR cache %s: %s', filename, e)
+            return None
+
+        OCRCache._remember(key, words)
+        return words
+
+
+    @classmethod
+    def _remember(cls, key:str, words:list):
+        if len(cls._MEMORY)>=cls.MAX_MEMORY_ITEMS: cls._MEMORY.pop(next(iter(cls._MEMORY)), None)
+        cls._MEMORY[key] = words
+
+
+    def put(self, key:str, words:list):
+        '''Cache words of page image.'''
+        OCRCache._remember(key, words)
+        if not self.cache_dir: return
+
+        # write to a temporary file first, in case of concurrent conversions
+        filename = os.path.join(self.cache_dir, f'{key}.json')
+        tmp_filename = f'{filename}.{os.getpid()}.tmp'
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
+            json.dump(words, f)
+        os.replace(tmp_filename, filename)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+'''Base class of OCR engine recognizing words in page images.
+
+An engine runs in the OCR worker processes, so it's initialized from picklable options and
+recognizes images given as PNG bytes. Recognized words are in the following structure, where
+``bbox`` is in pixels of the image, and words in same line share the ``block`` and ``line`` id::
+
+    {
+        'text' : str,
+        'bbox' : (x0, y0, x1, y1),
+        'block': int,
+        'line' : int,
+        'conf' : float   # confidence in [0, 100]
+    }
+'''
+
+import json
+import hashlib
+
+
+class OCRException(Exception):
+    '''OCR engine is unavailable or fails to recognize images.'''
+
+
+class OCREngine:
+    '''Recognize words in page images.'''
+
+    name = ''
+
+    def __init__(self, **options):
+        '''
+        Args:
+            options (dict): Engine specific options, e.g. language.
+        '''
+        self.options = options
+
+
+    @property
+    def signature(self):
+        '''Engine name and options, which identify the recognition results of an image.'''
+        options = json.dumps(self.options, sort_keys=True, default=str)
+        return f'{self.name}-{hashlib.sha1(options.encode()).hexdigest()[:16]}'
+
+
+    def recognize(self, image:bytes, dpi:int):
+        '''Recognize words in an image.
+
+        Args:
+            image (bytes): PNG image data.
+            dpi (int): Resolution of the image.
+
+        Returns:
+            list: Recognized words.
+        '''
+        raise NotImplementedError
+
+
+    def recognize_batch(self, images:list, dpi:int):
+        '''Recognize words in a batch of images. Override it if the engine processes a batch
+        more efficiently, e.g. in one call.
+
+        Args:
+            images (list): PNG image data.
+            dpi (int): Resolution of the images.
+
+        Returns:
+            list: Recognized words of each image.
+        '''
+        return [self.recognize(image, dpi) for image in images]
@@ -0,0 +1,33 @@
+'''
+Load :py:class:`~pdf2docx.ocr.OCREngine` with specified name, e.g. tesseract. Other engines, 
+e.g. an ONNX model running on CPU, could be plugged in by ``register()``, or passing the 
+``OCREngine`` subclass directly.
+'''
+
+from .OCREngine import OCREngine
+from .TesseractEngine import TesseractEngine
+
+
+class OCREngineFactory:
+
+    MAP = {
+        'TESSERACT': TesseractEngine
+    }
+
+    @classmethod
+    def register(cls, name:str, klass:type):
+        '''Register OCR engine class with name.'''
+        cls.MAP[name.upper()] = klass
+
+
+    @classmethod
+    def create(cls, engine='tesseract', **options):
+        '''Create OCR engine with name or ``OCREngine`` subclass, and engine options.'''
+        if isinstance(engine, type) and issubclass(engine, OCREngine):
+            klass = engine
+        else:
+            klass = cls.MAP.get(str(engine).upper(), None)
+        if not klass:
+            raise TypeError(f'OCR engine "{engine}" is not implemented yet.')
+        else:
+            return klass(**options)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+'''Recognize text of scanned pages with a pluggable OCR engine.
+
+* Each page is rendered to a PNG image once, in the main process since ``PyMuPDF`` pages can't
+  be shared across processes.
+* Images already recognized are read from :py:class:`~pdf2docx.ocr.OCRCache` by image hash.
+* The others are recognized in batches by a process pool, each worker initializing the OCR
+  engine once.
+* Recognized words are converted to text blocks in the structure of ``page.get_text('rawdict')``,
+  i.e. coordinates relative to un-rotated page, so they're restored as extracted text.
+
+Example::
+
+    recognizer = PageRecognizer.from_settings(settings)
+    images = [recognizer.render(page) for page in fitz_pages]
+    blocks_of_pages = recognizer.recognize(images)
+'''
+
+import logging
+import multiprocessing
+from multiprocessing import Pool, cpu_count
+import fitz
+from .OCRCache import OCRCache
+from .OCREngineFactory import OCREngineFactory
+from ..common.constants import DEFAULT_FONT_NAME
+
+
+class PageRecognizer:
+    '''Render pages and recognize text in a process pool.'''
+
+    def __init__(self, engine='tesseract', options:dict=None, resolution:int=300, workers:int=0,
+                    batch_size:int=4, cache_dir:str=None):
+        '''
+        Args:
+            engine (str, type): Name of OCR engine registered in ``OCREngineFactory``, or an
+                ``OCREngine`` subclass. Defaults to 'tesseract'.
+            options (dict, optional): Options to initialize OCR engine. Defaults to None.
+            resolution (int, optional): Resolution (dpi) of page images. Defaults to 300.
+            workers (int, optional): Count of OCR processes. Defaults to 0, i.e. cpu count.
+            batch_size (int, optional): Count of images recognized in an OCR task. Defaults to 4.
+            cache_dir (str, optional): Folder to cache results. Defaults to None, in memory only.
+        '''
+        self.engine_type = engine
+        self.options = options or {}
+        self.resolution = resolution
+        self.workers = workers or cpu_count()
+        self.batch_size = max(batch_size, 1)
+        self.cache = OCRCache(cache_dir)
+
+        # initialize engine in current process, so that any error raises early
+        self._engine = OCREngineFactory.create(engine, **self.options)
+
+
+    @classmethod
+    def from_settings(cls, settings:dict):
+        return cls(settings['ocr_engine'], settings['ocr_options'], settings['ocr_resolution'],
+                    settings['ocr_workers'], settings['ocr_batch_size'], settings['ocr_cache_dir'])
+
+
+    def render(self, page:fitz.Page):
+        '''Render page to image, with the information mapping image to page coordinates.
+
+        Args:
+            page (fitz.Page): Page to render.
+
+        Returns:
+            dict: ``{'image': bytes, 'key': str, 'matrix': fitz.Matrix}``, where ``matrix``
+            maps image pixels to un-rotated page coordinates.
+        '''
+        zoom = self.resolution / 72.0
+        image = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY).tobytes()
+        return {
+            'image' : image,
+            'key'   : OCRCache.key(image, self._engine.signature),
+            'matrix': fitz.Matrix(1/zoom, 1/zoom) * page.derotation_matrix
+        }
+
+
+    def recognize(self, page_images:list):
+        '''Recognize rendered page images.
+
+        Args:
+            page_images (list): Rendered page images, see ``render()``.
+
+        Returns:
+            list: Text blocks in ``rawdict`` structure of each page.
+        '''
+        # recognize the images not in cache
+        words = [self.cache.get(item['key']) for item in page_images]
+        todo = [i for i, res in enumerate(words) if res is None]
+        if todo:
+            images = [page_images[i]['image'] for i in todo]
+            for i, res in zip(todo, self._recognize_images(images)):
+                self.cache.put(page_images[i]['key'], res)
+                words[i] = res
+        logging.info('OCR: %d of %d pages recognized, the others from cache.',
+                        len(todo), len(page_images))
+
+        return [PageRecognizer.to_blocks(res, item['matrix']) \
+                    for res, item in zip(words, page_images)]
+
+
+    def _recognize_images(self, images:list):
+        '''Recognize images in batches, with a process pool if more than one batch.'''
+        batches = [images[i:i+self.batch_size] for i in range(0, len(images), self.batch_size)]
+        workers = min(self.workers, len(batches))
+
+        # NOTE: daemonic process, e.g. converting pages with multi-processing, can't have children
+        if workers<=1 or multiprocessing.current_process().daemon:
+            results = [self._engine.recognize_batch(batch, self.resolution) for batch in batches]
+        else:
+            initargs = (self.engine_type, self.options, self.resolution)
+            with Pool(workers, _init_worker, initargs) as pool:
+                results = pool.map(_recognize_batch, batches)
+
+        return [words for batch in results for words in batch]
+
+
+    @staticmethod
+    def to_blocks(words:list, matrix:fitz.Matrix):
+        '''Convert recognized words to text blocks in ``rawdict`` structure: one block per OCR
+        block, and one span per OCR line, with char bbox estimated by dividing word bbox evenly.
+
+        Args:
+            words (list): Recognized words, with bbox in image pixels.
+            matrix (fitz.Matrix): Matrix mapping image pixels to un-rotated page coordinates.
+
+        Returns:
+            list: Text blocks.
+        '''
+        # group words by block and line in order
+        blocks = {}
+        for word in words:
+            if not word['text']: continue
+            blocks.setdefault(word['block'], {}).setdefault(word['line'], []).append(word)
+
+        # text direction: horizontal in image, i.e. the rotated page
+        a, b, c, d, _, _ = matrix
+        direction = fitz.Point(1, 0) * fitz.Matrix(a, b, c, d, 0, 0)
+        scale = abs(direction) # pixel to point
+        direction = tuple(direction / scale)
+
+        raw_blocks = []
+        for lines in blocks.values():
+            raw_lines = [PageRecognizer._to_line(line_words, matrix, direction, scale) \
+                            for line_words in lines.values()]
+            bbox = fitz.Rect()
+            for line in raw_lines: bbox |= line['bbox']
+            raw_blocks.append({'type': 0, 'bbox': tuple(bbox), 'lines': raw_lines})
+
+        return raw_blocks
+
+
+    @staticmethod
+    def _to_line(words:list, matrix:fitz.Matrix, direction:tuple, scale:float):
+        '''Text line with one span from recognized words in a line.'''
+        # chars in image pixels, with a blank between adjacent words
+        chars = []
+        y0 = min(word['bbox'][1] for word in words)
+        y1 = max(word['bbox'][3] for word in words)
+        for i, word in enumerate(words):
+            x0, _, x1, _ = word['bbox']
+            if i: chars.append((' ', chars[-1][2], x0))
+            dx = (x1-x0) / len(word['text'])
+            chars.extend((c, x0+j*dx, x0+(j+1)*dx) for j, c in enumerate(word['text']))
+
+        # to page coordinates
+        raw_chars = []
+        for c, x0, x1 in chars:
+            raw_chars.append({
+                'c'     : c,
+                'bbox'  : tuple(fitz.Rect(x0, y0, max(x0, x1), y1) * matrix),
+                'origin': tuple(fitz.Point(x0, y1) * matrix)
+            })
+
+        bbox = fitz.Rect(words[0]['bbox'][0], y0, words[-1]['bbox'][2], y1) * matrix
+        span = {
+            'bbox' : tuple(bbox),
+            'font' : DEFAULT_FONT_NAME,
+            'size' : round((y1-y0)*scale, 1),
+            'flags': 0,
+            'color': 0,
+            'chars': raw_chars
+        }
+        return {'bbox': tuple(bbox), 'wmode': 0, 'dir': direction, 'spans': [span]}
+
+
+# -----------------------------------------------------------------------
+# OCR engine in worker process
+# -----------------------------------------------------------------------
+_ENGINE = None
+_RESOLUTION = 300
+
+def _init_worker(engine, options:dict, resolution:int):
+    global _ENGINE, _RESOLUTION
+    _ENGINE = OCREngineFactory.create(engine, **options)
+    _RESOLUTION = resolution
+
+
+def _recognize_batch(images:list):
+    return _ENGINE.recognize_batch(images, _RESOLUTION)
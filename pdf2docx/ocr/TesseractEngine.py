@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+'''OCR engine based on the command line interface of `Tesseract <https://github.com/tesseract-ocr/tesseract>`_,
+so no python binding is required but the ``tesseract`` executable and language data.
+
+A batch of images is recognized in one ``tesseract`` call with a list file, which avoids
+loading the language model for each image.
+'''
+
+import os
+import shutil
+import subprocess
+import tempfile
+from .OCREngine import (OCREngine, OCRException)
+
+
+class TesseractEngine(OCREngine):
+    '''Recognize words with ``tesseract`` command.'''
+
+    name = 'tesseract'
+
+    def __init__(self, language:str='eng', psm:int=3, executable:str='tesseract', timeout:float=None):
+        '''
+        Args:
+            language (str, optional): Language data, e.g. ``eng+chi_sim``. Defaults to 'eng'.
+            psm (int, optional): Page segmentation mode. Defaults to 3, i.e. fully automatic.
+            executable (str, optional): Path to ``tesseract``. Defaults to 'tesseract'.
+            timeout (float, optional): Timeout (seconds) of a ``tesseract`` call. Defaults to None.
+        '''
+        super().__init__(language=language, psm=psm)
+        self.executable = shutil.which(executable)
+        if not self.executable:
+            raise OCRException(f'Tesseract executable "{executable}" is not found.')
+        self.timeout = timeout
+
+
+    def recognize(self, image:bytes, dpi:int):
+        return self._run('stdin', image, dpi).get(1, [])
+
+
+    def recognize_batch(self, images:list, dpi:int):
+        if len(images)==1: return [self.recognize(images[0], dpi)]
+
+        with tempfile.TemporaryDirectory(prefix='pdf2docx-ocr-') as folder:
+            filenames = []
+            for i, image in enumerate(images):
+                filename = os.path.join(folder, f'{i}.png')
+                with open(filename, 'wb') as f: f.write(image)
+                filenames.append(filename)
+
+            list_file = os.path.join(folder, 'images.txt')
+            with open(list_file, 'w', encoding='utf-8') as f: f.write('\n'.join(filenames))
+
+            pages = self._run(list_file, None, dpi)
+
+        return [pages.get(i, []) for i in range(1, len(images)+1)]
+
+
+    def _run(self, source:str, data:bytes, dpi:int):
+        '''Run ``tesseract`` and parse the output in TSV format.
+
+        Returns:
+            dict: Words of each image, ``{page_num: [words]}`` where page_num starts from 1.
+        '''
+        cmd = [self.executable, source, 'stdout', '-l', self.options['language'],
+                '--psm', str(self.options['psm']), '--dpi', str(dpi), 'tsv']
+        try:
+            res = subprocess.run(cmd, input=data, capture_output=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired as e:
+            raise OCRException(f'Tesseract timeout: {e}')
+        if res.returncode:
+            raise OCRException(f'Tesseract error: {res.stderr.decode(errors="ignore").strip()}')
+
+        return TesseractEngine._parse_tsv(res.stdout.decode('utf-8', errors='ignore'))
+
+
+    @staticmethod
+    def _parse_tsv(tsv:str):
+        '''Collect words from TSV output, i.e. columns ``level, page_num, block_num, par_num,
+        line_num, word_num, left, top, width, height, conf, text``.'''
+        pages = {}
+        for row in tsv.splitlines()[1:]:
+            cols = row.split('\t')
+            if len(cols)<12 or cols[0]!='5': continue # word level only
+            text = cols[11].strip()
+            if not text: continue
+
+            page, block, par, line = map(int, cols[1:5])
+            x, y, w, h = map(int, cols[6:10])
+            pages.setdefault(page, []).append({
+                'text' : text,
+                'bbox' : (x, y, x+w, y+h),
+                'block': block,
+                'line' : par*10000+line, # line id unique in block
+                'conf' : float(cols[10])
+            })
+        return pages
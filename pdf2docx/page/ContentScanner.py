@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+'''Cheap pre-scan of page content streams before extracting page with ``PyMuPDF``.
+
+The content stream of page and the form XObjects it references are tokenized to count the
+operators, e.g. showing text, constructing and painting paths, without interpreting the page.
+A form XObject might be shared by many pages, so the operators are cached per xref.
+
+The statistics classify page into :py:class:`~pdf2docx.common.share.PageType`, based on which
+the page is routed to a cheaper process, e.g. no vector graphics detection for plain text page.
+
+.. note::
+    Text and paths are supposed to exist in page content stream and form XObjects only, which
+    is same to hiding page text in :py:class:`~pdf2docx.image.ImagesExtractor`. Annotations are
+    not scanned, so page with annotations other than links is classified as ``UNKNOWN``.
+'''
+
+import re
+from collections import Counter
+import fitz
+from ..common.share import PageType
+from ..common import constants
+
+
+# tokens of content stream: strings, names and comments are matched to be skipped, so that only
+# the operators, e.g. ``Tj`` and ``re``, and keywords, e.g. ``true``, are captured
+_TOKEN = re.compile(rb'''
+    \((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\)  # literal string, one level of nested parentheses
+  | <[0-9A-Fa-f\s]*>                           # hex string
+  | /[^\s/\[\]()<>{}%]*                        # name
+  | %[^\r\n]*                                  # comment
+  | ([A-Za-z'"][A-Za-z0-9*'"]*)                # operator or keyword
+''', re.X | re.S)
+
+# end of inline image data
+_INLINE_IMAGE_END = re.compile(rb'\sEI(?=\s|$)')
+
+# invisible text rendering mode, i.e. ``3 Tr``; matching in strings may give false positive only
+_INVISIBLE_TEXT = re.compile(rb'(?<![\w.+-])3(?:\.0*)?\s+Tr(?![A-Za-z0-9*])')
+_INVISIBLE_TEXT_KEY = b'3 Tr' # pseudo operator counting invisible text rendering mode
+
+TEXT_OPERATORS = {b'Tj', b'TJ', b"'", b'"'}
+LINE_OPERATORS = {b'l', b're'}
+CURVE_OPERATORS = {b'c', b'v', b'y'}
+STROKE_OPERATORS = {b'S', b's', b'B', b'B*', b'b', b'b*'}
+FILL_OPERATORS = {b'f', b'F', b'f*', b'B', b'B*', b'b', b'b*', b'sh'}
+
+
+class ContentScanner:
+    '''Count operators of page content streams and classify pages.'''
+
+    def __init__(self, doc:fitz.Document):
+        '''
+        Args:
+            doc (fitz.Document): pdf document to scan.
+        '''
+        self._doc = doc
+        self._operators = {} # xref -> Counter of operators
+
+
+    def scan(self, page:fitz.Page):
+        '''Scan page contents and classify the page.
+
+        Args:
+            page (fitz.Page): Page to scan.
+
+        Returns:
+            dict: Page type and counts of operators, e.g. ``{'type': PageType.TEXT, 'text': 10,
+            'lines': 0, 'curves': 0, 'strokes': 0, 'fills': 0, 'invisible_text': 0, 'images': 1,
+            'image_coverage': 0.2, 'annotations': 0}``.
+        '''
+        xrefs = list(page.get_contents())
+        xrefs.extend(xref for (xref, name, invoker, bbox) in page.get_xobjects())
+        operators = Counter()
+        for xref in xrefs: operators.update(self._scan_stream(xref))
+
+        def count(names): return sum(operators[name] for name in names)
+        stats = {
+            'text'        : count(TEXT_OPERATORS),
+            'lines'       : count(LINE_OPERATORS),
+            'curves'      : count(CURVE_OPERATORS),
+            'strokes'     : count(STROKE_OPERATORS),
+            'fills'       : count(FILL_OPERATORS),
+            'invisible_text': operators[_INVISIBLE_TEXT_KEY],
+            'images'      : len(page.get_images()) + operators[b'BI'],
+            'image_coverage': 0.0,
+            'annotations' : sum(1 for (xref, annot_type, *_) in page.annot_xrefs() \
+                                    if annot_type!=fitz.PDF_ANNOT_LINK)
+        }
+
+        # image coverage matters for page without text and paths only, i.e. potential scanned page
+        paths = stats['strokes'] or stats['fills']
+        if not stats['text'] and not paths and stats['images']:
+            stats['image_coverage'] = self._image_coverage(page)
+
+        stats['type'] = self.classify(stats)
+        return stats
+
+
+    @staticmethod
+    def has_invisible_text(stats:dict):
+        '''Whether invisible text, i.e. text rendering mode 3, might exist in the scanned page.'''
+        return bool(stats['invisible_text'] or stats['annotations'])
+
+
+    @staticmethod
+    def classify(stats:dict):
+        '''Page type based on statistics of page contents.'''
+        if stats['annotations']: return PageType.UNKNOWN
+
+        paths = stats['strokes'] or stats['fills']
+        if not paths:
+            if not stats['text'] and stats['image_coverage']>=constants.FACTOR_MAJOR:
+                return PageType.SCANNED
+            return PageType.TEXT
+
+        # more curves than straight segments
+        return PageType.VECTOR if stats['curves'] > stats['lines'] else PageType.TABULAR
+
+
+    def _scan_stream(self, xref:int):
+        '''Count operators of the content stream with given xref.'''
+        operators = self._operators.get(xref)
+        if operators is None:
+            stream = self._doc.xref_stream(xref) or b''
+            operators = self._operators[xref] = self._count_operators(stream)
+            if b'Tr' in stream:
+                operators[_INVISIBLE_TEXT_KEY] = len(_INVISIBLE_TEXT.findall(stream))
+        return operators
+
+
+    @staticmethod
+    def _count_operators(stream:bytes):
+        '''Count operators in content stream, with strings and inline image data skipped.'''
+        if b'ID' not in stream:
+            operators = Counter(_TOKEN.findall(stream))
+            operators.pop(b'', None)
+            return operators
+
+        # skip binary data of inline images: ``BI ... ID <data> EI``
+        operators, pos = Counter(), 0
+        while True:
+            match = _TOKEN.search(stream, pos)
+            if not match: break
+            pos = match.end()
+            op = match.group(1)
+            if not op: continue
+            operators[op] += 1
+            if op==b'ID':
+                end = _INLINE_IMAGE_END.search(stream, pos)
+                pos = end.end() if end else len(stream)
+
+        return operators
+
+
+    @staticmethod
+    def _image_coverage(page:fitz.Page):
+        '''Ratio of page area covered by images, ignoring the overlap of images.'''
+        rect = page.cropbox # image bbox is relative to un-rotated page
+        area = sum((fitz.Rect(info['bbox']) & rect).get_area() for info in page.get_image_info())
+        return min(area/rect.get_area(), 1.0) if rect.get_area() else 0.0
@@ -39,8 +39,6 @@ Page elements structure:
 
 '''
 
-from docx.shared import Pt
-from docx.enum.section import WD_SECTION
 from ..common.Collection import BaseCollection
 from ..common.share import debug_plot
 from .BasePage import BasePage
@@ -93,6 +91,14 @@ class Page(BasePage):
         # floating images are separate node under page
         self.float_images = float_images or BaseCollection()
 
+        # fallback mode if the page exceeds parsing budget, e.g. text, raster
+        self.fallback = None
+
+        # page type classified by pre-scanning page contents, to route page to a cheaper process
+        self.page_type = None
+        self.hidden_text = None # whether invisible text might exist, None if unknown
+        self.ocr_blocks = None  # text blocks recognized by OCR, in raw dict structure
+
         self._finalized = False
 
     @property
@@ -111,6 +117,7 @@ class Page(BasePage):
             'footer': self.footer,
             'floats': self.float_images.store()
         }
+        if self.fallback: res['fallback'] = self.fallback
         return res
 
     def restore(self, data: dict):
@@ -127,6 +134,7 @@ class Page(BasePage):
         self.sections.restore(data.get('sections', []))
         self.header = data.get('header', '')
         self.footer = data.get('footer', '')
+        self.fallback = data.get('fallback', None)
 
         # float images
         self._restore_float_images(data.get('floats', []))
@@ -177,6 +185,9 @@ class Page(BasePage):
         Args:
             doc (Document): ``python-docx`` document object
         '''
+        from docx.shared import Pt
+        from docx.enum.section import WD_SECTION
+
         # new page
         if doc.paragraphs:
             section = doc.add_section(WD_SECTION.NEW_PAGE)
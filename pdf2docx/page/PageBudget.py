@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+'''CPU time and memory budget for parsing a page.
+
+A pathological page, e.g. tens of thousands of tiny vector paths, might take minutes to parse.
+``PageBudget`` stops the parsing process once the CPU time or memory consumed by current page
+exceeds its budget, so that the page could fall back to a cheap mode, e.g. plain text.
+
+The budget is checked cooperatively: parsing steps call :py:func:`check_budget` at stage
+boundaries, e.g. after cleaning up a page or parsing tables of a layout, and in each iteration
+of expensive loops, e.g. per path when detecting vector graphics and per candidate when parsing
+stream tables. So a pathological page is cut short, while never interrupted in the middle of
+any ``PyMuPDF`` call changing page contents.
+
+* CPU time is counted by ``time.thread_time()``, i.e. the thread parsing current page only.
+* Memory is the increment of resident set size of current process, so it makes sense only if
+  pages are parsed one by one, i.e. it's ignored when parsing pages concurrently.
+'''
+
+import os
+import logging
+from time import thread_time
+from contextvars import ContextVar
+
+
+_BUDGET = ContextVar('page_budget', default=None) # budget of the page parsed in current context
+
+
+class PageBudgetExceeded(BaseException):
+    '''Raised when parsing a page exceeds its budget.
+
+    .. note::
+        Derived from ``BaseException``, so it's not swallowed by any ``except Exception``
+        clause in the parsing process.
+    '''
+
+
+def check_budget():
+    '''Raise ``PageBudgetExceeded`` if the page parsed in current context exceeds its budget.
+    Called at stage boundaries of the parsing process; nothing to do without any budget.'''
+    budget = _BUDGET.get()
+    if budget is not None: budget.check()
+
+
+class PageBudget:
+    '''Context manager limiting CPU time and memory of the enclosed parsing process.'''
+
+    def __init__(self, cpu_time:float=0.0, memory:float=0.0, memory_interval:float=0.01):
+        '''
+        Args:
+            cpu_time (float, optional): CPU time in seconds. Defaults to 0.0, i.e. no limit.
+            memory (float, optional): Memory increment in MB. Defaults to 0.0, i.e. no limit.
+            memory_interval (float, optional): Read memory at most once in this CPU time
+                (seconds), since it's much slower than reading CPU time.
+        '''
+        self.cpu_time = cpu_time or 0.0
+        self.memory = memory or 0.0
+        self.memory_interval = memory_interval
+        self._t0 = 0.0
+        self._m0 = 0
+        self._t_memory = 0.0 # CPU time of the last memory check
+        self._token = None
+
+    @classmethod
+    def from_settings(cls, settings:dict):
+        return cls(settings['page_cpu_budget'], settings['page_memory_budget'])
+
+    @property
+    def enabled(self): return self.cpu_time>0 or self.memory>0
+
+
+    def __enter__(self):
+        if not self.enabled: return self
+        self._t0 = self._t_memory = thread_time()
+        self._m0 = _rss() if self.memory else 0
+        self._token = _BUDGET.set(self)
+        return self
+
+
+    def __exit__(self, *args):
+        if self._token is None: return
+        _BUDGET.reset(self._token)
+        self._token = None
+
+
+    def check(self):
+        '''Raise ``PageBudgetExceeded`` if CPU time or memory exceeds the budget.'''
+        if self._token is None: return
+
+        now = thread_time()
+        t = now - self._t0
+        if self.cpu_time and t > self.cpu_time:
+            raise PageBudgetExceeded(f'CPU time {t:.1f}s exceeds budget {self.cpu_time}s.')
+
+        if not self.memory or now-self._t_memory < self.memory_interval: return
+        self._t_memory = now
+        m = (_rss() - self._m0) / 1024**2
+        if m > self.memory:
+            raise PageBudgetExceeded(f'Memory {m:.1f}MB exceeds budget {self.memory}MB.')
+
+
+def _rss():
+    '''Resident set size of current process in bytes.'''
+    try:
+        # current rss on Linux
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        # peak rss otherwise: KB on Linux, bytes on macOS
+        import resource, sys
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform=='darwin' else rss*1024
+    except ImportError:
+        return 0
@@ -3,17 +3,40 @@
 '''Collection of :py:class:`~pdf2docx.page.Page` instances.'''
 
 import logging
+import threading
 from collections import Counter
 
 from .RawPageFactory import RawPageFactory
+from .ContentScanner import ContentScanner
+from .PageBudget import (PageBudget, PageBudgetExceeded, check_budget)
 from ..common.Collection import BaseCollection
+from ..common.Element import Element
+from ..common.share import PageType
 from ..font.Fonts import Fonts
+from ..ocr.PageRecognizer import PageRecognizer
 import re
 
 
+def fallback_modes(settings:dict):
+    '''Fallback modes in order when a page exceeds its budget; plain text at least.'''
+    modes = settings['page_fallback'] or []
+    if isinstance(modes, str): modes = modes.split(',')
+    return [mode.strip() for mode in modes if mode.strip()] or ['text']
+
+
 class Pages(BaseCollection):
     '''A collection of ``Page``.'''
 
+    def __init__(self, instances=None, parent=None):
+        super().__init__(instances, parent)
+        self._fonts = None
+        self._words_found = False
+        self._words_checked = False
+        self._extraction_stats = Counter() # count of extracted pages and fast paths taken
+
+        # PyMuPDF is not thread-safe, so extract pages with lock in case of multi-threading
+        self._fitz_lock = threading.RLock()
+
     def parse(self, fitz_doc, **settings):
         '''Analyze document structure, e.g. page section, header, footer.
 
@@ -24,42 +47,16 @@ class Pages(BaseCollection):
         # ---------------------------------------------
         # 0. extract fonts properties, especially line height ratio
         # ---------------------------------------------
-        fonts = Fonts.extract(fitz_doc)
+        self.prepare(fitz_doc, **settings)
 
         # ---------------------------------------------
         # 1. extract and then clean up raw page
         # ---------------------------------------------
-        pages, raw_pages = [], []
-        words_found = False
-        for page in self:
-            if page.skip_parsing: continue
-
-            # init and extract data from PDF
-            raw_page = RawPageFactory.create(page_engine=fitz_doc[page.id], backend='PyMuPDF')
-            raw_page.restore(**settings)
-
-            # check if any words are extracted since scanned pdf may be directed
-            if not words_found and raw_page.raw_text.strip():
-                words_found = True
-
-            # process blocks and shapes based on bbox
-            raw_page.clean_up(**settings)
-
-            # process font properties
-            raw_page.process_font(fonts)            
-
-            # after this step, we can get some basic properties
-            # NOTE: floating images are detected when cleaning up blocks, so collect them here
-            page.width = raw_page.width
-            page.height = raw_page.height
-            page.float_images.reset().extend(raw_page.blocks.floating_image_blocks)
-
-            raw_pages.append(raw_page)
-            pages.append(page)
+        pages = [page for page in self if not page.skip_parsing]
+        raw_pages = [self.extract_page(page, fitz_doc, **settings) for page in pages]
 
         # show message if no words found
-        if not words_found:
-            logging.warning('Words count: 0. It might be a scanned pdf, which is not supported yet.')
+        self.check_words()
 
         
         # ---------------------------------------------
@@ -76,9 +73,196 @@ class Pages(BaseCollection):
         # ---------------------------------------------
         # parse sections
         for page, raw_page in zip(pages, raw_pages):
+            self.analyze_page(page, raw_page, fitz_doc, **settings)
+
+
+    def analyze_pages(self, items, fitz_doc, **settings):
+        '''Analyze extracted pages one by one as they come, e.g. from a pipeline.
+
+        .. note::
+            Document level structure, e.g. header and footer, is not parsed from raw pages yet,
+            see :py:meth:`_parse_document`, so each page is analyzed once it's extracted.
+
+        Args:
+            items (iterable): Extracted pages in order, ``(page, raw_page)``.
+            fitz_doc (fitz.Document): ``PyMuPDF`` Document instance.
+            settings (dict): Parsing parameters.
+
+        Yields:
+            Page: Analyzed page in order.
+        '''
+        for page, raw_page in items:
+            self.analyze_page(page, raw_page, fitz_doc, **settings)
+            yield page
+
+
+    def prepare(self, fitz_doc, **settings):
+        '''Prepare for parsing pages, e.g. extract fonts properties, especially line height ratio,
+        classify pages and recognize text of scanned pages if ocr=1.'''
+        self._fonts = Fonts.extract(fitz_doc)
+        self._words_found = False
+        self._words_checked = False
+        self._extraction_stats.clear()
+
+        # classify pages by scanning page contents, so as to route pages to cheaper process
+        scanner = ContentScanner(fitz_doc)
+        pages = [page for page in self if not page.skip_parsing]
+        with self._fitz_lock:
+            for page in pages:
+                stats = scanner.scan(fitz_doc[page.id])
+                page.page_type = stats['type']
+                page.hidden_text = ContentScanner.has_invisible_text(stats)
+        types = Counter(page.page_type.name for page in pages)
+        logging.info('Page types: %s', ', '.join(f'{k}={v}' for k, v in types.items()))
+
+        # recognize text of scanned pages
+        ocr = settings.get('ocr', 0)==1
+        if ocr: self._recognize(fitz_doc, [page for page in pages \
+                                if page.page_type==PageType.SCANNED], **settings)
+
+        # warn early, rather than after extracting all pages, if no text at all
+        if not ocr and pages and all(page.page_type==PageType.SCANNED for page in pages):
+            self.check_words()
+
+
+    def extract_page(self, page, fitz_doc, **settings):
+        '''Init raw page, extract data from PDF and clean up, or fall back to cheap contents if
+        exceeding page budget.
+
+        Args:
+            page (Page): Page to process.
+            fitz_doc (fitz.Document): ``PyMuPDF`` Document instance.
+            settings (dict): Parsing parameters.
+
+        Returns:
+            RawPage: Extracted page.
+        '''
+        try:
+            with PageBudget.from_settings(settings):
+                raw_page = self._init_raw_page(page, fitz_doc, **settings)
+        except PageBudgetExceeded as e:
+            raw_page = self._init_raw_page_with_fallback(page, fitz_doc, e, **settings)
+
+        self._extraction_stats['pages'] += 1
+        if raw_page.texttrace_skipped: self._extraction_stats['texttrace_skipped'] += 1
+
+        # check if any words are extracted since scanned pdf may be directed
+        if not self._words_found and raw_page.raw_text.strip():
+            self._words_found = True
+
+        return raw_page
+
+
+    def analyze_page(self, page, raw_page, fitz_doc, **settings):
+        '''Parse structure in page level, e.g. page margin and section, or extract the page
+        again with cheap contents if exceeding page budget.
+
+        Args:
+            page (Page): Page to process.
+            raw_page (RawPage): Extracted page.
+            fitz_doc (fitz.Document): ``PyMuPDF`` Document instance.
+            settings (dict): Parsing parameters.
+        '''
+        if page.fallback: # cheap contents already
+            self._parse_raw_page(page, raw_page, **settings)
+            return
+        try:
+            with PageBudget.from_settings(settings):
+                self._parse_raw_page(page, raw_page, **settings)
+        except PageBudgetExceeded as e:
+            page.sections.reset()
+            raw_page = self._init_raw_page_with_fallback(page, fitz_doc, e, **settings)
+            self._parse_raw_page(page, raw_page, **settings)
+
+
+    def check_words(self):
+        '''Show message if no words found in extracted pages, and statistics of extraction.'''
+        stats = self._extraction_stats
+        if stats['pages']:
+            logging.info('Hidden text checking skipped for %d of %d pages.',
+                stats['texttrace_skipped'], stats['pages'])
+        if not self._words_found and not self._words_checked:
+            self._words_checked = True
+            logging.warning('Words count: 0. It might be a scanned pdf, try to recognize text with ocr=1.')
+
+
+    def fallback(self, page, fitz_doc, mode:str, **settings):
+        '''Extract and analyze page again with cheap contents in fallback mode.
+
+        Args:
+            page (Page): Page to process.
+            fitz_doc (fitz.Document): ``PyMuPDF`` Document instance.
+            mode (str): Fallback mode, e.g. ``no_stream_table``, ``text`` or ``raster``.
+            settings (dict): Parsing parameters.
+        '''
+        page.fallback = mode
+        page.sections.reset()
+        raw_page = self._init_raw_page(page, fitz_doc, **settings)
+        self._parse_raw_page(page, raw_page, **settings)
+
+
+    def _recognize(self, fitz_doc, pages:list, **settings):
+        '''Recognize text of pages with OCR engine, rendering pages in current process while
+        recognizing in a process pool.'''
+        if not pages: return
+        try:
+            recognizer = PageRecognizer.from_settings(settings)
+            with self._fitz_lock:
+                images = [recognizer.render(fitz_doc[page.id]) for page in pages]
+            for page, blocks in zip(pages, recognizer.recognize(images)):
+                page.ocr_blocks = blocks
+        except Exception as e:
+            if not settings['ignore_page_error']: raise
+            logging.error('Ignore OCR due to error: %s', e)
+
+
+    def _init_raw_page(self, page, fitz_doc, **settings):
+        '''Extract data from PDF, clean up and process fonts.'''
+        # init and extract data from PDF
+        # NOTE: no stream table is a parsing option, so extract all contents anyway
+        mode = page.fallback if page.fallback in ('text', 'raster') else None
+        with self._fitz_lock:
+            raw_page = RawPageFactory.create(page_engine=fitz_doc[page.id], backend='PyMuPDF')
+            raw_page.fallback = mode
+            raw_page.page_type = page.page_type
+            raw_page.hidden_text = page.hidden_text
+            raw_page.ocr_blocks = page.ocr_blocks
+        with Element.rotation_context(raw_page.rotation_matrix):
+            with self._fitz_lock: raw_page.restore(**settings)
+            check_budget()
+
+            # process blocks and shapes based on bbox
+            raw_page.clean_up(**settings)
+            check_budget()
+
+            # process font properties
+            raw_page.process_font(self._fonts)
+
+        # after this step, we can get some basic properties
+        # NOTE: floating images are detected when cleaning up blocks, so collect them here
+        page.width = raw_page.width
+        page.height = raw_page.height
+        page.float_images.reset().extend(raw_page.blocks.floating_image_blocks)
+
+        return raw_page
+
+
+    def _init_raw_page_with_fallback(self, page, fitz_doc, error, **settings):
+        '''Extract page with the first extraction fallback mode, i.e. ``text`` or ``raster``.'''
+        modes = [mode for mode in fallback_modes(settings) if mode!='no_stream_table']
+        page.fallback = modes[0] if modes else 'text'
+        logging.warning('Page %d falls back to "%s" mode: %s', page.id+1, page.fallback, error)
+        return self._init_raw_page(page, fitz_doc, **settings)
+
+
+    @staticmethod
+    def _parse_raw_page(page, raw_page, **settings):
+        '''Calculate page margin and parse sections.'''
+        with Element.rotation_context(raw_page.rotation_matrix):
             # page margin
             margin = raw_page.calculate_margin(**settings)
             raw_page.margin = page.margin = margin
+            check_budget()
 
             # page section
             sections = raw_page.parse_section(**settings)
@@ -91,27 +275,37 @@ class Pages(BaseCollection):
         # TODO
         return '', ''
 
-    def extract_header_footer(self, **settings):
+    def extract_header_footer(self, pages:list=None, targets:list=None):
+        '''Mark header and footer blocks by the text repeated in the first/last section of pages.
+
+        Args:
+            pages (list, optional): Pages to compare with each other. Defaults to None, i.e. all pages.
+            targets (list, optional): Pages to mark header/footer blocks, e.g. the current page of a
+                look-ahead window in pipeline. Defaults to None, i.e. all the compared pages.
+        '''
         header_blocks = []
         footer_blocks = []
-        for page in self:
+        candidates = set() # id of blocks to mark
+        for page in (self if pages is None else pages):
             if not page.finalized: continue
             header_section = page.sections[0] if len(page.sections) > 1 else []
             footer_section = page.sections[-1] if len(page.sections) > 1 else []
             header_blocks.append([column.blocks[0] for column in header_section])
             footer_blocks.append([column.blocks[-1] for column in footer_section])
+            if targets is None or any(page is target for target in targets):
+                candidates.update(id(block) for block in header_blocks[-1] + footer_blocks[-1])
 
         first_column_header = [blocks[0] for blocks in header_blocks if blocks]
         second_column_header = [blocks[1] for blocks in header_blocks if len(blocks) > 1]
-        self.mark_header_footer_block(first_column_header, header=True)
-        self.mark_header_footer_block(second_column_header, header=True)
+        self.mark_header_footer_block(first_column_header, header=True, candidates=candidates)
+        self.mark_header_footer_block(second_column_header, header=True, candidates=candidates)
         first_column_footer = [blocks[0] for blocks in footer_blocks if blocks]
         second_column_footer = [blocks[1] for blocks in footer_blocks if len(blocks) > 1]
-        self.mark_header_footer_block(first_column_footer, header=False)
-        self.mark_header_footer_block(second_column_footer, header=False)
+        self.mark_header_footer_block(first_column_footer, header=False, candidates=candidates)
+        self.mark_header_footer_block(second_column_footer, header=False, candidates=candidates)
 
 
-    def mark_header_footer_block(self, blocks, header=False):
+    def mark_header_footer_block(self, blocks, header=False, candidates:set=None):
         if not blocks: return
         text_list = []
         for block in blocks:
@@ -130,6 +324,7 @@ class Pages(BaseCollection):
         if text_counter.most_common(1)[0][1] > len(remove_number_text) / 2:
             most_common_text = text_counter.most_common(1)[0][0]
             for block in blocks:
+                if candidates is not None and id(block) not in candidates: continue
                 if block.is_text_block:
                     if self.remove_number(block.text) == most_common_text:
                         block.mark_header() if header else block.mark_footer()
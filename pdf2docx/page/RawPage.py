@@ -24,15 +24,22 @@ from ..common.Collection import Collection
 class RawPage(BasePage, Layout):
     '''A wrapper of page engine.'''
 
-    def __init__(self, page_engine=None):
+    def __init__(self, page_engine=None, fallback:str=None):
         ''' Initialize page layout.
         
         Args:
             page_engine (Object): Source pdf page.
+            fallback (str, optional): Extract cheap contents only in fallback mode, e.g. 
+                ``text`` or ``raster``. Defaults to None, i.e. extract all contents.
         '''
         BasePage.__init__(self)
         Layout.__init__(self)
         self.page_engine = page_engine
+        self.fallback = fallback
+        self.page_type = None   # classified by pre-scanning page contents, see ``ContentScanner``
+        self.hidden_text = None # whether invisible text might exist, None if unknown
+        self.texttrace_skipped = False # fast path: no hidden text checking
+        self.ocr_blocks = None  # text blocks recognized by OCR, in raw dict structure
     
 
     def extract_raw_dict(self, **settings):
@@ -47,6 +54,12 @@ class RawPage(BasePage, Layout):
         ```
         '''
         raise NotImplementedError
+
+    @property
+    def rotation_matrix(self):
+        '''Matrix converting source coordinates to real page CS, i.e. with page rotation 
+        considered. Defaults to None, i.e. no rotation.'''
+        return None
     
     @property
     def text(self):
@@ -151,7 +164,12 @@ class RawPage(BasePage, Layout):
         .. note::
             - Only two-columns Sections are considered for now.
             - Page margin must be parsed before this step.
+            - Rows and columns are detected by checking elements pairwise by default, or by gaps
+              of the projection profile if ``section_detection='projection'``, which is faster
+              for pages with lots of elements.
         '''
+        projection = settings['section_detection']=='projection'
+
         # bbox
         X0, Y0, X1, _ = self.working_bbox
     
@@ -172,7 +190,7 @@ class RawPage(BasePage, Layout):
                 column.add_elements(elements)
             # otherwise, create new section
             else:
-                section = self._create_section(num_col, elements, (X0, X1), y_ref)
+                section = self._create_section(num_col, elements, (X0, X1), y_ref, projection)
                 if section: 
                     sections.append(section)
 
@@ -180,9 +198,9 @@ class RawPage(BasePage, Layout):
         # check section row by row
         pre_num_col = 1
         y_ref = Y0 # to calculate v-distance between sections
-        for row in elements.group_by_rows():
+        for row in elements.group_by_rows(projection=projection):
             # check column col by col
-            cols = row.group_by_columns()
+            cols = row.group_by_columns(projection=projection)
             current_num_col = len(cols)
 
             # column check:
@@ -211,7 +229,7 @@ class RawPage(BasePage, Layout):
             if pre_num_col==2 and current_num_col==1:
                 # though current row has one single column, it might have another virtual 
                 # and empty column. If so, it should be counted as 2-cols
-                cols = lines.group_by_columns()
+                cols = lines.group_by_columns(projection=projection)
                 pos = cols[0].bbox[2]
                 if row.bbox[2]<=pos or row.bbox[0]>pos:
                     current_num_col = 2
@@ -228,7 +246,7 @@ class RawPage(BasePage, Layout):
                 # though both 2-cols, they don't align with each other
                 combine = Collection(lines)
                 combine.extend(row)
-                if len(combine.group_by_columns(sorted=False))==1: current_num_col = 1
+                if len(combine.group_by_columns(sorted=False, projection=projection))==1: current_num_col = 1
 
 
             # finalize pre-section if different from the column count of previous section
@@ -253,7 +271,7 @@ class RawPage(BasePage, Layout):
     
 
     @staticmethod
-    def _create_section(num_col:int, elements:Collection, h_range:tuple, y_ref:float):
+    def _create_section(num_col:int, elements:Collection, h_range:tuple, y_ref:float, projection:bool=False):
         '''Create section based on column count, candidate elements and horizontal boundary.'''
         if not elements: return
         X0, X1 = h_range
@@ -265,7 +283,7 @@ class RawPage(BasePage, Layout):
             section = Section(space=0, columns=[column])
             before_space = y0 - y_ref
         else:
-            cols = elements.group_by_columns()
+            cols = elements.group_by_columns(projection=projection)
             u0, v0, u1, v1 = cols[0].bbox
             m0, n0, m1, n1 = cols[1].bbox
             u = (u1+m0)/2.0
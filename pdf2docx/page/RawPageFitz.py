@@ -4,44 +4,94 @@
 A wrapper of PyMuPDF Page as page engine.
 '''
 
+import copy
 import logging
+from time import perf_counter
+from contextlib import contextmanager
+import fitz
 from .RawPage import RawPage
+from .PageBudget import check_budget
 from ..image.ImagesExtractor import ImagesExtractor
 from ..shape.Paths import Paths
 from ..common.constants import FACTOR_A_HALF
-from ..common.Element import Element
-from ..common.share import (RectType, debug_plot)
+from ..common.share import (RectType, PageType, debug_plot)
 from ..common.algorithm import get_area
 
 
 class RawPageFitz(RawPage):
-    '''A wrapper of ``fitz.Page`` to extract source contents.'''
+    '''A wrapper of ``fitz.Page`` to extract source contents.
+
+    The page content without text is interpreted into a display list only once, which is
+    shared by detecting svg contours and clipping images. Text, hidden text, images, paths and
+    links are still extracted from the page directly, since PyMuPDF supports them for
+    ``fitz.Page`` only, e.g. ``TextPage`` is created from the un-rotated page.
+    '''
+
+    def __init__(self, page_engine=None, fallback:str=None):
+        super().__init__(page_engine, fallback)
+        self.timings = {} # elapsed time (seconds) of each extraction step
+
+
+    @contextmanager
+    def _timing(self, name:str):
+        '''Accumulate elapsed time of the enclosed extraction step to ``self.timings``.'''
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + perf_counter() - t0
+
+    @property
+    def id(self):
+        '''Page index, or None if no source page.'''
+        return self.page_engine.number if self.page_engine else None
+
+    @property
+    def rotation_matrix(self):
+        return self.page_engine.rotation_matrix if self.page_engine else None
 
     def extract_raw_dict(self, **settings):
         raw_dict = {}
         if not self.page_engine: return raw_dict
+        self.timings = {}
+
+        # share the page display list without text in the following steps
+        images_extractor = ImagesExtractor(self.page_engine)
 
         # actual page size
         *_, w, h = self.page_engine.rect # always reflecting page rotation
         raw_dict.update({ 'width' : w, 'height': h })
         self.width, self.height = w, h
 
+        # fallback mode: the entire page as an image
+        if self.fallback=='raster':
+            raw_dict['blocks'] = [self._preprocess_page_image(**settings)]
+            raw_dict['shapes'] = []
+
         # pre-processing layout elements. e.g. text, images and shapes
-        text_blocks = self._preprocess_text(**settings)
-        raw_dict['blocks'] = text_blocks
+        else:
+            text_blocks = self._preprocess_text(**settings)
+            raw_dict['blocks'] = text_blocks
+            raw_dict['shapes'] = []
 
-        image_blocks = self._preprocess_images(**settings)
-        raw_dict['blocks'].extend(image_blocks)
-        
-        shapes, images =  self._preprocess_shapes(**settings)
-        raw_dict['shapes'] = shapes
-        raw_dict['blocks'].extend(images)
+            # fallback mode: plain text only
+            if self.fallback!='text':
+                check_budget()
+                image_blocks = self._preprocess_images(images_extractor, **settings)
+                raw_dict['blocks'].extend(image_blocks)
+                check_budget()
+
+                # no paths to extract if no painting operators in page contents
+                if self.page_type not in (PageType.TEXT, PageType.SCANNED):
+                    shapes, images =  self._preprocess_shapes(images_extractor, **settings)
+                    raw_dict['shapes'].extend(shapes)
+                    raw_dict['blocks'].extend(images)
 
-        hyperlinks = self._preprocess_hyperlinks()
-        raw_dict['shapes'].extend(hyperlinks)        
-       
-        # Element is a base class processing coordinates, so set rotation matrix globally
-        Element.set_rotation_matrix(self.page_engine.rotation_matrix)
+            hyperlinks = self._preprocess_hyperlinks()
+            raw_dict['shapes'].extend(hyperlinks)        
+
+        logging.debug('Extraction time of page %s: %s', self.id,
+            ', '.join(f'{name}={t:.3f}s' for name, t in self.timings.items()))
 
         return raw_dict
     
@@ -55,18 +105,29 @@ class RawPageFitz(RawPage):
             https://pymupdf.readthedocs.io/en/latest/functions.html#Page.get_texttrace
             https://pymupdf.readthedocs.io/en/latest/textpage.html
         '''
+        # text recognized by OCR, e.g. scanned page with ocr=1
+        # NOTE: copy blocks since they're changed when restored, while the page might be
+        # extracted again in fallback mode
+        if self.ocr_blocks is not None: return copy.deepcopy(self.ocr_blocks)
         ocr = settings['ocr']
-        if ocr==1: raise SystemExit("OCR feature is planned but not implemented yet.")
 
         # all text blocks no matter hidden or not
-        raw = self.page_engine.get_text('rawdict', flags=64)
+        with self._timing('text'):
+            raw = self.page_engine.get_text('rawdict', flags=64)
         text_blocks = raw.get('blocks', [])
+        if not text_blocks or self.page_type==PageType.SCANNED: return text_blocks
+
+        # fast path: nothing to ignore if invisible text can't exist
+        if ocr!=2 and self.hidden_text is False:
+            self.texttrace_skipped = True
+            return text_blocks
 
         # potential UnicodeDecodeError issue when trying to filter hidden text:
         # https://github.com/dothinking/pdf2docx/issues/144
         # https://github.com/dothinking/pdf2docx/issues/155
         try:
-            spans = self.page_engine.get_texttrace()
+            with self._timing('texttrace'):
+                spans = self.page_engine.get_texttrace()
         except SystemError:
             logging.warning('Ignore hidden text checking due to UnicodeDecodeError in upstream library.')
             spans = []
@@ -106,27 +167,51 @@ class RawPageFitz(RawPage):
         return blocks
 
 
-    def _preprocess_images(self, **settings):
+    def _preprocess_images(self, images_extractor:ImagesExtractor, **settings):
         '''Extract image blocks. Image block extracted by ``page.get_text('rawdict')`` doesn't 
         contain alpha channel data, so it has to get page images by ``page.get_images()`` and 
         then recover them. Note that ``Page.get_images()`` contains each image only once, i.e., 
         ignore duplicated occurrences.
+
+        Args:
+            images_extractor (ImagesExtractor): Extractor shared with vector graphics clipping.
         '''
-        # ignore image if ocr-ed pdf: get ocr-ed text only
-        if settings['ocr']==2: return []
+        # ignore image if ocr-ed pdf or page recognized by OCR: get ocr-ed text only
+        if settings['ocr']==2 or self.ocr_blocks: return []
+        
+        with self._timing('images'):
+            return images_extractor.extract_images(settings['clip_image_res_ratio'])
+
+
+    def _preprocess_page_image(self, **settings):
+        '''Render the entire page, including text, to an image block.
         
-        return ImagesExtractor(self.page_engine).extract_images(settings['clip_image_res_ratio'])
-
-
-    def _preprocess_shapes(self, **settings):
-        '''Identify iso-oriented paths and convert vector graphic paths to pixmap.'''
-        paths = self._init_paths(**settings)
-        return paths.to_shapes_and_images(
-            settings['min_svg_gap_dx'], 
-            settings['min_svg_gap_dy'], 
-            settings['min_svg_w'], 
-            settings['min_svg_h'], 
-            settings['clip_image_res_ratio'])
+        NOTE: the rendered pixmap reflects page rotation already, while the bbox is relative to 
+        un-rotated page.
+        '''
+        page = self.page_engine
+        zoom = settings['clip_image_res_ratio']
+        with self._timing('page_image'):
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        return ImagesExtractor._to_raw_dict(pix, page.rect * page.derotation_matrix)
+
+
+    def _preprocess_shapes(self, images_extractor:ImagesExtractor, **settings):
+        '''Identify iso-oriented paths and convert vector graphic paths to pixmap.
+
+        Args:
+            images_extractor (ImagesExtractor): Extractor shared with images extraction.
+        '''
+        with self._timing('drawings'):
+            paths = self._init_paths(**settings)
+        with self._timing('vector_graphics'):
+            return paths.to_shapes_and_images(
+                settings['min_svg_gap_dx'], 
+                settings['min_svg_gap_dy'], 
+                settings['min_svg_w'], 
+                settings['min_svg_h'], 
+                settings['clip_image_res_ratio'],
+                images_extractor)
     
 
     @debug_plot('Source Paths')
@@ -143,7 +228,9 @@ class RawPageFitz(RawPage):
             list: A list of source hyperlink dict.
         """
         hyperlinks = []
-        for link in self.page_engine.get_links():
+        with self._timing('links'):
+            links = self.page_engine.get_links()
+        for link in links:
             if link['kind']!=2: continue # consider internet address only
             hyperlinks.append({
                 'type': RectType.HYPERLINK.value,
@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+
+'''Long-lived conversion service with a warm worker pool.
+
+Converting a single file per process pays the startup cost, i.e. importing ``PyMuPDF``,
+``python-docx``, ``fontTools`` and ``opencv``, on every call. This service keeps a pool of
+warm worker processes with these dependencies imported in advance, and feeds them from
+a priority job queue:
+
+* an ``asyncio`` front end accepts jobs over HTTP, either a TCP port or a Unix socket;
+* each job is a PDF file in bytes, converted by a free worker and returned as docx bytes;
+* jobs with lower ``priority`` value are processed first, FIFO for same priority;
+* a job exceeding its timeout is cancelled by terminating and restarting its worker.
+
+HTTP API:
+
+* ``POST /convert``: request body is the PDF file, at most ``max_body_size`` bytes; the
+  response body streams back the docx file. Optional query parameters: ``priority``, ``timeout``, ``start``, ``end``, ``pages``
+  (comma separated page indexes) and ``password``. A full job queue is responded with
+  ``503 Service Unavailable`` and a ``Retry-After`` header.
+* ``GET /status``: JSON summary of workers and jobs.
+
+Example::
+
+    $ pdf2docx serve --port=8000 --workers=4
+    $ curl --data-binary @demo.pdf -o demo.docx "http://127.0.0.1:8000/convert?priority=1"
+'''
+
+import json
+import asyncio
+import logging
+import multiprocessing
+from io import BytesIO
+from itertools import count
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ServiceException(Exception):
+    pass
+
+class JobTimeoutError(ServiceException):
+    pass
+
+class RequestTooLargeError(ServiceException):
+    pass
+
+class QueueFullError(ServiceException):
+    pass
+
+
+# -------------------------------------------------------------------------------------------
+# worker process
+# -------------------------------------------------------------------------------------------
+def _warm_up():
+    '''Import heavy dependencies in advance, so a job pays nothing for them.'''
+    import fitz
+    import docx
+    import fontTools.ttLib
+    from .converter import Converter
+    docx.Document() # load default template
+
+
+def _convert(pdf:bytes, password:str=None, start:int=0, end:int=None, pages:list=None, **kwargs):
+    '''Convert pdf stream to docx stream.'''
+    from .converter import Converter
+    kwargs['multi_processing'] = False # no child process for a worker
+    cv = Converter(password=password, stream=pdf)
+    docx = BytesIO()
+    try:
+        cv.convert(docx, start, end, pages, **kwargs)
+    finally:
+        cv.close()
+    return docx.getvalue()
+
+
+def _worker_main(conn):
+    '''Loop in worker process: receive job, convert and send back the result.'''
+    logging.getLogger().setLevel(logging.ERROR) # mute page-level logs
+    _warm_up()
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if job is None: break # stop signal
+        try:
+            res = (True, _convert(**job))
+        except Exception as e:
+            res = (False, f'{e.__class__.__name__}: {e}')
+        conn.send(res)
+    conn.close()
+
+
+class Worker:
+    '''A warm conversion process connected by a pipe.
+
+    Workers are spawned rather than forked by default: a worker restarted after a timeout is
+    created while the server is listening, and a forked child would inherit the listening
+    socket and all accepted connections, so closing a connection in the server never delivers
+    EOF to its client.
+    '''
+
+    def __init__(self, context=None):
+        self._context = context or multiprocessing.get_context('spawn')
+        self._process = None
+        self._conn = None
+
+    @property
+    def alive(self): return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        self._conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self._process.start()
+        child_conn.close()
+        return self
+
+    def run(self, job:dict):
+        '''Send job and wait for the result, blocking.
+
+        Returns:
+            bytes: docx file in bytes.
+        '''
+        self._conn.send(job)
+        try:
+            ok, res = self._conn.recv()
+        except (EOFError, OSError):
+            raise ServiceException('Worker process exited unexpectedly.')
+        if not ok: raise ServiceException(res)
+        return res
+
+    def stop(self, force:bool=False):
+        if self._process is None: return
+        if force:
+            self._process.terminate()
+        else:
+            try:
+                self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self._process.join(timeout=5)
+        if self._process.is_alive(): self._process.kill()
+        self._conn.close()
+        self._process = None
+
+    def restart(self):
+        self.stop(force=True)
+        return self.start()
+
+
+# -------------------------------------------------------------------------------------------
+# service
+# -------------------------------------------------------------------------------------------
+class Job:
+    '''Conversion job in the queue.'''
+
+    def __init__(self, payload:dict, priority:int, timeout:float, future:asyncio.Future):
+        self.payload = payload
+        self.priority = priority
+        self.timeout = timeout
+        self.future = future
+
+
+class ConversionService:
+    '''Convert PDF files with a pool of warm worker processes.'''
+
+    retry_after = 5 # seconds for clients to wait before retrying when job queue is full
+
+    def __init__(self, workers:int=0, timeout:float=600.0, max_queue_size:int=0,
+                    max_body_size:int=100*1024*1024):
+        '''
+        Args:
+            workers (int, optional): Count of worker processes. Defaults to 0, i.e. cpu count.
+            timeout (float, optional): Default timeout (seconds) of a job. Defaults to 600.
+            max_queue_size (int, optional): Reject jobs when queue is full. Defaults to 0, no limit.
+            max_body_size (int, optional): Reject requests with larger body (bytes). Defaults to 100MB.
+        '''
+        self.num_workers = workers or multiprocessing.cpu_count()
+        self.timeout = timeout
+        self.max_queue_size = max_queue_size
+        self.max_body_size = max_body_size
+
+        self._workers = []
+        self._queue = None
+        self._dispatchers = []
+        self._executor = None
+        self._sequence = count() # FIFO for jobs with same priority
+        self._stats = {'processed': 0, 'failed': 0, 'timeout': 0}
+
+
+    @property
+    def status(self):
+        return dict(self._stats,
+            workers=sum(w.alive for w in self._workers),
+            queued=self._queue.qsize() if self._queue else 0)
+
+
+    async def start(self):
+        '''Start worker processes and dispatchers.'''
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue(self.max_queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        starts = [loop.run_in_executor(self._executor, Worker().start) for _ in range(self.num_workers)]
+        self._workers = list(await asyncio.gather(*starts))
+        self._dispatchers = [asyncio.ensure_future(self._dispatch(w)) for w in self._workers]
+        logging.info('Conversion service started with %d workers.', self.num_workers)
+        return self
+
+
+    async def close(self):
+        '''Stop dispatchers and worker processes.'''
+        for task in self._dispatchers: task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+
+        loop = asyncio.get_running_loop()
+        stops = [loop.run_in_executor(self._executor, w.stop) for w in self._workers]
+        await asyncio.gather(*stops, return_exceptions=True)
+        self._workers = []
+        self._executor.shutdown(wait=False)
+
+
+    async def __aenter__(self): return await self.start()
+
+    async def __aexit__(self, *args): await self.close()
+
+
+    async def submit(self, pdf:bytes, priority:int=0, timeout:float=None, **kwargs):
+        '''Put a conversion job to the queue and wait for the result.
+
+        Args:
+            pdf (bytes): PDF file in bytes.
+            priority (int, optional): Jobs with lower value are processed first. Defaults to 0.
+            timeout (float, optional): Cancel the job if not finished in the given seconds.
+                Defaults to None, i.e. the service timeout.
+            kwargs (dict): Arguments of :py:meth:`~pdf2docx.converter.Converter.convert`,
+                e.g. ``start``, ``end``, ``pages`` and configuration parameters, plus ``password``.
+
+        Returns:
+            bytes: docx file in bytes.
+        '''
+        if self._queue is None: raise ServiceException('Service is not started.')
+        if self._queue.full(): raise QueueFullError('Too many queued jobs.')
+
+        future = asyncio.get_running_loop().create_future()
+        job = Job(dict(kwargs, pdf=pdf), priority, timeout or self.timeout, future)
+        self._queue.put_nowait((priority, next(self._sequence), job))
+        return await future
+
+
+    async def _dispatch(self, worker:Worker):
+        '''Feed worker with jobs in the queue.'''
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self._queue.get()
+            if job.future.done(): continue # cancelled by client
+
+            try:
+                res = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, worker.run, job.payload), job.timeout)
+            except asyncio.TimeoutError:
+                # the only way to stop a running conversion is to kill the process
+                self._stats['timeout'] += 1
+                await loop.run_in_executor(None, worker.restart)
+                self._set_result(job, exception=JobTimeoutError(f'Job exceeds timeout {job.timeout}s.'))
+            except asyncio.CancelledError:
+                # stop worker in thread, not to block other connections in the event loop
+                await loop.run_in_executor(None, worker.stop, True)
+                raise
+            except Exception as e:
+                self._stats['failed'] += 1
+                if not worker.alive: await loop.run_in_executor(None, worker.restart)
+                self._set_result(job, exception=e)
+            else:
+                self._stats['processed'] += 1
+                self._set_result(job, result=res)
+
+
+    @staticmethod
+    def _set_result(job:Job, result=None, exception:Exception=None):
+        if job.future.done(): return
+        if exception: job.future.set_exception(exception)
+        else: job.future.set_result(result)
+
+
+    # -----------------------------------------------------------------------
+    # HTTP front end
+    # -----------------------------------------------------------------------
+    async def serve(self, host:str='127.0.0.1', port:int=8000, unix_socket:str=None):
+        '''Start service and serve HTTP requests forever.
+
+        Args:
+            host (str, optional): Host to bind. Defaults to '127.0.0.1'.
+            port (int, optional): Port to bind. Defaults to 8000.
+            unix_socket (str, optional): Listen on Unix socket path instead of TCP port.
+        '''
+        async with self:
+            server = await self.start_server(host, port, unix_socket)
+            async with server:
+                await server.serve_forever()
+
+
+    async def start_server(self, host:str='127.0.0.1', port:int=8000, unix_socket:str=None):
+        '''Start accepting HTTP requests without serving forever. The service must be started.
+
+        Args:
+            host (str, optional): Host to bind. Defaults to '127.0.0.1'.
+            port (int, optional): Port to bind, 0 for a free port. Defaults to 8000.
+            unix_socket (str, optional): Listen on Unix socket path instead of TCP port.
+
+        Returns:
+            asyncio.AbstractServer: The listening server.
+        '''
+        if unix_socket:
+            server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+            logging.info('Listening on %s', unix_socket)
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+            logging.info('Listening on http://%s:%d', host, server.sockets[0].getsockname()[1])
+        return server
+
+
+    async def _handle(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        '''Handle one HTTP request.'''
+        try:
+            method, target, headers = await self._read_head(reader)
+            url = urlsplit(target)
+            if method=='GET' and url.path=='/status':
+                await self._respond(writer, 200, json.dumps(self.status).encode(), 'application/json')
+
+            elif method=='POST' and url.path=='/convert':
+                length = int(headers.get('content-length', 0))
+                if length<0: raise ValueError('Invalid Content-Length.')
+                if not length: raise ValueError('Empty request body.')
+                if length>self.max_body_size:
+                    raise RequestTooLargeError(f'Request body exceeds {self.max_body_size} bytes.')
+                pdf = await reader.readexactly(length)
+                params = self._parse_params(url.query)
+                docx = await self.submit(pdf, **params)
+                await self._respond(writer, 200, docx,
+                    'application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+
+            else:
+                await self._respond(writer, 404, b'Not found.')
+
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            await self._respond(writer, 400, str(e).encode())
+        except RequestTooLargeError as e:
+            await self._respond(writer, 413, str(e).encode())
+        except QueueFullError as e:
+            await self._respond(writer, 503, str(e).encode(),
+                                headers={'Retry-After': str(self.retry_after)})
+        except JobTimeoutError as e:
+            await self._respond(writer, 504, str(e).encode())
+        except ServiceException as e:
+            await self._respond(writer, 500, str(e).encode())
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+    @staticmethod
+    async def _read_head(reader:asyncio.StreamReader):
+        '''Read request line and headers.'''
+        line = (await reader.readline()).decode('latin-1').split()
+        if len(line)!=3: raise ValueError('Invalid request line.')
+        method, target, _ = line
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line: break
+            key, _, value = line.partition(':')
+            headers[key.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+
+    @staticmethod
+    def _parse_params(query:str):
+        '''Job parameters from URL query string.'''
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        res = {}
+        for key in ('priority', 'start', 'end'):
+            if key in params: res[key] = int(params[key])
+        if 'timeout' in params: res['timeout'] = float(params['timeout'])
+        if 'pages' in params: res['pages'] = [int(i) for i in params['pages'].split(',')]
+        if 'password' in params: res['password'] = params['password']
+        return res
+
+
+    @staticmethod
+    async def _respond(writer:asyncio.StreamWriter, code:int, body:bytes,
+                        content_type:str='text/plain', chunk_size:int=65536, headers:dict=None):
+        '''Write HTTP response, streaming body in chunks.'''
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+                    500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+        head = f'HTTP/1.1 {code} {reasons.get(code, "")}\r\n' \
+                f'Content-Type: {content_type}\r\n' \
+                f'Content-Length: {len(body)}\r\n'
+        for key, value in (headers or {}).items(): head += f'{key}: {value}\r\n'
+        head += 'Connection: close\r\n\r\n'
+        writer.write(head.encode('latin-1'))
+        for i in range(0, len(body), chunk_size):
+            writer.write(body[i:i+chunk_size])
+            await writer.drain()
+        await writer.drain()
@@ -14,6 +14,7 @@ import fitz
 from ..image.ImagesExtractor import ImagesExtractor
 from ..common.share import lazyproperty
 from ..common.Collection import  Collection
+from ..page.PageBudget import check_budget
 from .Path import Path
 
 
@@ -24,6 +25,7 @@ class Paths(Collection):
         '''Initialize paths from raw data get by ``page.get_drawings()``.'''
         rect = (0, 0, self.parent.width, self.parent.height)
         for raw in raws:
+            check_budget()
             path = Path(raw)
             # ignore path out of page
             if not path.bbox.intersects(rect): continue
@@ -74,7 +76,8 @@ class Paths(Collection):
 
 
     def to_shapes_and_images(self, min_svg_gap_dx:float=15, min_svg_gap_dy:float=15, 
-                                min_w:float=2, min_h:float=2, clip_image_res_ratio:float=3.0):
+                                min_w:float=2, min_h:float=2, clip_image_res_ratio:float=3.0,
+                                images_extractor:ImagesExtractor=None):
         '''Convert paths to iso-oriented shapes or images. The semantic type of path is either table/text style or 
         vector graphic. This method is to:
         * detect svg regions -> exist at least one non-iso-oriented path
@@ -87,6 +90,8 @@ class Paths(Collection):
             min_w (float): Ignore contours if the bbox width is less than this value.
             min_h (float): Ignore contours if the bbox height is less than this value.
             clip_image_res_ratio (float, optional): Resolution ratio of clipped bitmap. Defaults to 3.0.
+            images_extractor (ImagesExtractor, optional): Extractor to reuse the page display list. 
+                Defaults to None, i.e. create a new one.
 
         Returns:
             tuple: (list of shape raw dict, list of image raw dict).
@@ -99,7 +104,7 @@ class Paths(Collection):
 
         # detect svg with python opencv
         images = []
-        ie = ImagesExtractor(self.parent.page_engine)
+        ie = images_extractor or ImagesExtractor(self.parent.page_engine)
         groups = ie.detect_svg_contours(min_svg_gap_dx, min_svg_gap_dy, min_w, min_h)
 
         # `bbox` is the external bbox of current region, while `inner_bboxes` are the inner contours
@@ -115,6 +120,7 @@ class Paths(Collection):
         # group every path to one of the detected bbox
         group_paths = [Paths() for _ in groups] # type: list[Paths]
         for path in self._instances:
+            check_budget()
             for (bbox, inner_bboxes), paths in zip(groups, group_paths):            
                 if path.bbox.intersects(bbox):
                     if not contained_in_inner_contours(path, inner_bboxes): paths.append(path)
@@ -122,10 +128,12 @@ class Paths(Collection):
         
         # check each group
         for (bbox, inner_bboxes), paths in zip(groups, group_paths): 
+            check_budget()
             # all iso-oriented paths -> it's a table, but might contain svg in cell as well
             if paths.is_iso_oriented:
                 iso_shapes.extend(paths.to_shapes())
                 for svg_bbox in inner_bboxes:
+                    check_budget()
                     images.append(ie.clip_page_to_dict(fitz.Rect(svg_bbox), clip_image_res_ratio))
             
             # otherwise, it's a svg
@@ -6,6 +6,7 @@
 from .Shape import Shape, Stroke, Fill, Hyperlink
 from ..common.share import RectType
 from ..common.Collection import Collection, ElementCollection
+from ..common.algorithm import IntervalIndex
 from ..common import share
 from ..common import constants
 
@@ -87,8 +88,7 @@ class Shapes(ElementCollection):
                             shape.has_potential_type(RectType.UNDERLINE) or \
                             shape.has_potential_type(RectType.STRIKE) or \
                             shape.has_potential_type(RectType.HYPERLINK)
-        instances = set(filter(f, self._instances))
-        return ElementCollection(instances)
+        return ElementCollection(list(filter(f, self._instances)))
 
 
     def clean_up(self, max_border_width:float, shape_min_dimension:float):
@@ -139,13 +139,17 @@ class Shapes(ElementCollection):
         # assign shapes to table region        
         shapes_in_tables = [[] for _ in tables] # type: list[list[Shape]]
         shapes = []   # type: list[Shape]
+        index = IntervalIndex([(table.bbox.y0, table.bbox.y1) for table in tables])
         for shape in self._instances:
             # exclude explicit table borders which belongs to current layout
             if shape.equal_to_type(RectType.BORDER) or shape.equal_to_type(RectType.SHADING):
                 shapes.append(shape)
                 continue
 
-            for table, shapes_in_table in zip(tables, shapes_in_tables):
+            # check only the tables overlapped in y-direction
+            indexes = index.query(shape.bbox.y0, shape.bbox.y1)
+            for i in indexes:
+                table, shapes_in_table = tables[i], shapes_in_tables[i]
                 # fully contained in one table
                 if table.bbox.contains(shape.bbox):
                     shapes_in_table.append(shape)
@@ -233,11 +237,26 @@ class Shapes(ElementCollection):
             advance, though we needn't to ensure 100% accuracy. They are finally determined 
             when parsing table structure and text format.
         '''
+        import numpy as np
+
         # blocks in page (the original blocks without any further processing)
         blocks = self._parent.blocks
         blocks.sort_in_reading_order()
+        lines = list(blocks)
+        if not self._instances or not lines: return
+
+        # Lines checked by a shape in reading order: skip the lines above it, and stop at the
+        # first line below it. Locate this range by cumulative max of y1/y0, then filter the
+        # overlapped lines, so that each shape checks only the candidate lines.
+        y0 = np.array([line.bbox.y0 for line in lines])
+        y1 = np.array([line.bbox.y1 for line in lines])
+        max_y0, max_y1 = np.maximum.accumulate(y0), np.maximum.accumulate(y1)
 
         # check positions between shapes and text blocks
         for shape in self._instances:
-            shape.parse_semantic_type(blocks)
+            start = np.searchsorted(max_y1, shape.bbox.y0, side='left')  # the first max_y1>=shape.y0
+            end = np.searchsorted(max_y0, shape.bbox.y1, side='right')   # the first max_y0>shape.y1
+            if start>=end: continue
+            indexes = start + np.flatnonzero(y1[start:end]>=shape.bbox.y0)
+            shape.parse_semantic_type([lines[i] for i in indexes])
 
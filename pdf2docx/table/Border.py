@@ -28,6 +28,7 @@ from ..shape.Shape import Stroke
 from ..common import constants
 from ..common.share import RectType, rgb_value
 from ..common.Collection import BaseCollection
+from ..common.algorithm import IntervalIndex
 
 
 class Border:
@@ -295,14 +296,26 @@ class Borders(BaseCollection):
     
     def _finalize_by_strokes(self, strokes:list):
         '''Finalize borders by explicit strokes.'''
+        # horizontal stroke can finalize horizontal border only, and the stroke position must
+        # be in the valid range of border, so index borders by orientation and valid range
+        h_borders = [border for border in self._instances if border.is_horizontal]
+        v_borders = [border for border in self._instances if not border.is_horizontal]
+        def index(borders):
+            return IntervalIndex([(border.LRange-constants.MINOR_DIST, 
+                                    border.URange+constants.MINOR_DIST) for border in borders])
+        h_index, v_index = index(h_borders), index(v_borders)
+
         for stroke in strokes:
             if stroke.is_determined: continue
-            
-            for border in self._instances:
-                # horizontal stroke can finalize horizontal border only
-                if stroke.horizontal != border.is_horizontal: continue
-                
-                border.finalize_by_stroke(stroke)                
+
+            if stroke.horizontal:
+                borders, value = h_borders, stroke.y0
+                indexes = h_index.query(value, value)
+            else:
+                borders, value = v_borders, stroke.x0
+                indexes = v_index.query(value, value)
+
+            for i in indexes: borders[i].finalize_by_stroke(stroke)
 
 
     @staticmethod
@@ -322,44 +335,40 @@ class Borders(BaseCollection):
         Args:
             borders (list): A list of ``Border`` instances.
         '''
+        if not borders: return
+        import numpy as np
+
         # collect interval points and sort in x-increasing order
-        x_points = set()
-        for border in borders:
-            x_points.add(border.LRange)
-            x_points.add(border.URange)
-        
-        x_points = list(x_points)
-        x_points.sort()
-
-        # check intersection status of each intervals
-        x_status = [] # [(x, status), ...]
-        for i in range(len(x_points)-1):
-            x = (x_points[i]+x_points[i+1])/2.0 # center point
-            s = [int(border.is_valid(x)) for border in borders]
-            x_status.append((x,s))
+        lower = np.array([border.LRange for border in borders])
+        upper = np.array([border.URange for border in borders])
+        x_points = np.unique(np.concatenate((lower, upper)))
+
+        # check intersection status of each intervals: the center points v.s. valid range of
+        # borders, i.e. status matrix in shape (intervals, borders)
+        x_centers = (x_points[:-1]+x_points[1:])/2.0
+        status = (x_centers[:, None] >= lower-constants.MINOR_DIST) & \
+                    (x_centers[:, None] <= upper+constants.MINOR_DIST)
             
         # sort per count since preferring passing through more borders
-        x_status.sort(key=lambda item: sum(item[1]), reverse=True)
+        orders = np.argsort(-status.sum(axis=1), kind='stable')
 
         # finalize borders
-        num = len(borders)
-        current_status = [0] * num
-        for x, status in x_status:
+        current_status = np.zeros(len(borders), dtype=bool)
+        for i in orders:
             # terminate if all borders are finalized
-            if sum(current_status) == num: break
+            if current_status.all(): break
 
             # only one line is allowed to pass through one border range -> sum(A.*B)=0
             #  e.g. A = [1,0,1,0], B=[0,1,0,0] -> valid
             #       A = [1,0,1,0], B =[1,0,0,0] -> invalid due to two lines passing through border 1
-            duplicated = sum([c1*c2 for c1,c2 in zip(current_status, status)])
-            if duplicated: continue
+            if (current_status & status[i]).any(): continue
 
             # update current status
-            current_status = [c1+c2 for c1,c2 in zip(current_status, status)]
+            current_status |= status[i]
 
             # now, finalize borders
-            for border, border_status in zip(borders, status):
-                if border_status: border.finalize_by_value(int(x))
+            x = int(x_centers[i])
+            for k in np.flatnonzero(status[i]): borders[k].finalize_by_value(x)
 
 
     def _add_full_dummy_borders(self):
@@ -3,10 +3,8 @@
 '''Table Cell object.
 '''
 
-from docx.shared import Pt
 from ..common.Element import Element
 from ..layout.Layout import Layout
-from ..common import docx
 
 
 class Cell(Element, Layout):
@@ -70,6 +68,8 @@ class Cell(Element, Layout):
             table (Table): ``python-docx`` table instance.
             indexes (tuple): Row and column indexes, ``(i, j)``.
         '''        
+        from docx.shared import Pt
+
         # set cell style, e.g. border, shading, cell width
         self._set_style(table, indexes)
         
@@ -108,6 +108,8 @@ class Cell(Element, Layout):
             table (Table): ``python-docx`` table object.
             indexes (tuple): ``(i, j)`` index of current cell in table.
         '''
+        from ..common import docx
+
         i, j = indexes
         docx_cell = table.cell(i, j)
         n_row, n_col = self.merged_cells
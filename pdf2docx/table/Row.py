@@ -3,8 +3,6 @@
 '''Row in a table.
 '''
 
-from docx.enum.table import WD_ROW_HEIGHT
-from docx.shared import Pt
 from .Cells import Cells
 from ..common.Element import Element
 
@@ -60,6 +58,9 @@ class Row(Element):
             table (Table): ``python-docx`` table instance.
             idx_row (int): Current row index.
         '''  
+        from docx.enum.table import WD_ROW_HEIGHT
+        from docx.shared import Pt
+
         # set row height
         docx_row = table.rows[idx_row]
 
@@ -31,10 +31,10 @@ Data Structure::
 '''
 
 
+from bisect import (bisect_left, bisect_right)
 from .Row import Row
 from .Rows import Rows
 from ..common.Block import Block
-from ..common import docx
 
 
 class TableBlock(Block):
@@ -115,10 +115,8 @@ class TableBlock(Block):
         Args:
             blocks (list): A list of text/table blocks.
         '''
-        for row in self._rows:
-            for cell in row:
-                if not cell: continue
-                cell.assign_blocks(blocks)
+        for cell, blocks_in_cell in self._group_by_cells(blocks):
+            cell.assign_blocks(blocks_in_cell)
 
 
     def assign_shapes(self, shapes:list):
@@ -127,10 +125,49 @@ class TableBlock(Block):
         Args:
             shapes (list): A list of Shape.
         '''
-        for row in self._rows:
-            for cell in row:
-                if not cell: continue
-                cell.assign_shapes(shapes)
+        for cell, shapes_in_cell in self._group_by_cells(shapes):
+            cell.assign_shapes(shapes_in_cell)
+
+
+    def _group_by_cells(self, elements:list):
+        '''Group elements by the cells they might overlap with, so that each cell checks only
+        the candidate elements rather than all.
+
+        Cells are located by binary search on the sorted x/y coordinates of cell edges, i.e.
+        the column and row lines of table.
+
+        Returns:
+            list: ``[(cell, elements), ...]`` in cell order; elements in original order.
+        '''
+        cells = [cell for row in self._rows for cell in row if cell]
+        xs = sorted(set(x for cell in cells for x in (cell.bbox.x0, cell.bbox.x1)))
+        ys = sorted(set(y for cell in cells for y in (cell.bbox.y0, cell.bbox.y1)))
+
+        # grid slot (i,j) between ys[i], ys[i+1] and xs[j], xs[j+1] -> cells covering it
+        # NOTE: a merged cell covers multiple slots
+        grid = {}
+        for k, cell in enumerate(cells):
+            x0, y0, x1, y1 = cell.bbox
+            for i in range(bisect_left(ys, y0), bisect_left(ys, y1)):
+                for j in range(bisect_left(xs, x0), bisect_left(xs, x1)):
+                    grid.setdefault((i, j), []).append(k)
+
+        def slots(values, v0, v1):
+            # slots [i0, i1] overlapping interval [v0, v1], boundary included
+            i0 = max(bisect_left(values, v0)-1, 0)
+            i1 = min(bisect_right(values, v1)-1, len(values)-2)
+            return range(i0, i1+1)
+
+        elements_in_cells = [[] for _ in cells]
+        for e in elements:
+            x0, y0, x1, y1 = e.bbox
+            indexes = set()
+            for i in slots(ys, y0, y1):
+                for j in slots(xs, x0, x1):
+                    indexes.update(grid.get((i, j), []))
+            for k in indexes: elements_in_cells[k].append(e)
+
+        return [(cell, res) for cell, res in zip(cells, elements_in_cells) if res]
 
 
     def parse(self, **settings):
@@ -166,6 +203,8 @@ class TableBlock(Block):
         Args:
             table (Table): ``python-docx`` table instance.
         '''
+        from ..common import docx
+
         # set left indent
         docx.indent_table(table, self.left_space)
 
@@ -3,8 +3,11 @@
 '''Parsing table structure based on strokes and fills.
 '''
 
+from bisect import (bisect_left, bisect_right)
+from itertools import accumulate, count
 import fitz
 from ..common.Element import Element
+from ..common.algorithm import IntervalIndex
 from ..common.share import RectType
 from ..common import constants
 from ..shape.Shape import Shape, Stroke
@@ -41,7 +44,7 @@ class CellStructure:
     def is_merging(self): return self.merged_cells[0]>1 or self.merged_cells[1]>1
 
 
-    def parse_borders(self, h_strokes:dict, v_strokes:dict):
+    def parse_borders(self, h_strokes:dict, v_strokes:dict, h_ends:dict=None, v_ends:dict=None):
         '''Parse cell borders from strokes.
         
         Args:
@@ -49,20 +52,27 @@ class CellStructure:
                 ``{y0: [h1,h2,..], y1: [h3,h4,...]}``
             v_strokes (dict): A dict of x-coordinates v.s. vertical strokes, e.g. 
                 ``{x0: [v1,v2,..], x1: [v3,v4,...]}``
+            h_ends (dict, optional): A dict of y-coordinate v.s. cumulative max of the end 
+                x-coordinates of horizontal strokes, to skip strokes before the cell quickly.
+            v_ends (dict, optional): A dict of x-coordinate v.s. cumulative max of the end 
+                y-coordinates of vertical strokes.
         '''
+        h_ends, v_ends = h_ends or {}, v_ends or {}
         x0, y0, x1, y1 = self.merged_bbox
-        top = self._get_border_stroke(h_strokes[y0], 'row')
-        bottom = self._get_border_stroke(h_strokes[y1], 'row')
-        left = self._get_border_stroke(v_strokes[x0], 'col')
-        right = self._get_border_stroke(v_strokes[x1], 'col')
+        top = self._get_border_stroke(h_strokes[y0], 'row', h_ends.get(y0))
+        bottom = self._get_border_stroke(h_strokes[y1], 'row', h_ends.get(y1))
+        left = self._get_border_stroke(v_strokes[x0], 'col', v_ends.get(x0))
+        right = self._get_border_stroke(v_strokes[x1], 'col', v_ends.get(x1))
         self.borders = (top, bottom, left, right)
 
     
-    def parse_shading(self, fills:Shapes):
+    def parse_shading(self, fills:Shapes, index:IntervalIndex=None):
         '''Parse cell shading from fills.
         
         Args:
             fills (Shapes): Fill shapes representing cell shading.
+            index (IntervalIndex, optional): Index of fills by y-range, to check only fills 
+                overlapped with this cell. Defaults to None, i.e. check all fills.
         '''
         # border width
         top, bottom, left, right = self.borders
@@ -76,7 +86,9 @@ class CellStructure:
         inner_bbox = (x0+w_left/2.0, y0+w_top/2.0, x1-w_right/2.0, y1-w_bottom/2.0)
         target = Element().update_bbox(inner_bbox)
 
-        # shading shape of this cell        
+        # shading shape of this cell
+        if index is not None:
+            fills = [fills[i] for i in index.query(inner_bbox[1], inner_bbox[3])]
         for shape in fills:
             if shape.contains(target, threshold=constants.FACTOR_MOST):
                 self.shading = shape
@@ -85,12 +97,14 @@ class CellStructure:
             self.shading = None
 
 
-    def _get_border_stroke(self, strokes:Shapes, direction:str='row'):
+    def _get_border_stroke(self, strokes:Shapes, direction:str='row', ends:list=None):
         ''' Find strokes representing cell borders.
         
         Args:
             strokes (Shapes): Candidate stroke shapes for cell border.
             direction (str): Either ``row`` or ``col``.
+            ends (list, optional): Cumulative max of the end coordinates of ``strokes`` along 
+                the border direction.
         '''
         if not strokes: return Stroke()
 
@@ -100,10 +114,13 @@ class CellStructure:
         # cell range
         x0, x1 = self.merged_bbox[idx], self.merged_bbox[idx+2]
 
+        # skip strokes ending before the cell range, i.e. t1<=x0
+        start = bisect_right(ends, x0) if ends else 0
+
         # check all candidate strokes
         L = 0.0
         border_strokes = []
-        for stroke in strokes:
+        for stroke in strokes[start:]:
             bbox = (stroke.x0, stroke.y0, stroke.x1, stroke.y1)
             t0, t1 = bbox[idx], bbox[idx+2]
             if t1 <= x0: continue
@@ -249,11 +266,14 @@ class TableStructure:
         self._check_merging_status()
 
         # check cell borders/shadings
+        h_ends = {k: TableStructure._cumulative_max_ends(strokes, 'row') for k, strokes in self.h_strokes.items()}
+        v_ends = {k: TableStructure._cumulative_max_ends(strokes, 'col') for k, strokes in self.v_strokes.items()}
+        index = IntervalIndex([(fill.bbox.y0, fill.bbox.y1) for fill in fills])
         for row in self.cells:
             for cell in row:
                 if cell.is_merged: continue
-                cell.parse_borders(self.h_strokes, self.v_strokes)
-                cell.parse_shading(fills)
+                cell.parse_borders(self.h_strokes, self.v_strokes, h_ends, v_ends)
+                cell.parse_shading(fills, index)
         
         return self
 
@@ -346,26 +366,45 @@ class TableStructure:
             y2  +--------h6--------+----h7---+
 
         '''
-        def group_strokes(stroke:Shape, strokes:dict):
+        # NOTE: a stroke is merged into the group which is close enough and updated the earliest,
+        # i.e. the first one in the dict order. Keep the coordinates of groups sorted to locate the 
+        # close groups by binary search, and the update sequence of each group to select the first.
+        sequence = count()
+        def group_strokes(stroke:Shape, strokes:dict, keys:list, seq:dict):
             # y-coordinate of h-strokes or x-coordinate of v-strokes
             t = round(stroke.y0, 1) if stroke.horizontal else round(stroke.x0, 1)
 
             # ignore minor error resulting from different stroke width
-            for t_ in strokes:
-                if abs(t-t_)>min_border_clearance: continue
+            i0 = bisect_left(keys, t-min_border_clearance-constants.TINY_DIST)
+            i1 = bisect_right(keys, t+min_border_clearance+constants.TINY_DIST)
+            candidates = [t_ for t_ in keys[i0:i1] if abs(t-t_)<=min_border_clearance]
+            if candidates:
+                t_ = min(candidates, key=lambda k: seq[k])
                 t = (t_+t)/2.0 # average
                 strokes[t] = strokes.pop(t_)
                 strokes[t].append(stroke)
-                break
+
+                # update sorted keys and sequence
+                keys.pop(bisect_left(keys, t_))
+                seq.pop(t_)
+                if t not in seq: keys.insert(bisect_left(keys, t), t)
+                seq.setdefault(t, next(sequence)) # existing key keeps its position in dict
             else:
                 strokes[t] = Shapes([stroke])
+                keys.insert(bisect_left(keys, t), t)
+                seq[t] = next(sequence)
         
         h_strokes = {} # type: dict [float, Shapes]
         v_strokes = {} # type: dict [float, Shapes]
+        h_keys, v_keys = [], []
+        h_seq, v_seq = {}, {}
         X0, Y0, X1, Y1 = float('inf'), float('inf'), -float('inf'), -float('inf')
         for stroke in strokes:
             # group horizontal/vertical strokes in each row/column
-            group_strokes(stroke, h_strokes if stroke.horizontal else v_strokes)
+            if stroke.horizontal:
+                group_strokes(stroke, h_strokes, h_keys, h_seq)
+            else:
+                group_strokes(stroke, v_strokes, v_keys, v_seq)
 
             # update table region
             X0 = min(X0, stroke.x0)
@@ -415,26 +454,27 @@ class TableStructure:
         # check cell merging status in each row
         merged_cells_rows = []  # type: list[list[int]]
         ordered_strokes = [self.v_strokes[k] for k in x_cols]
+        ordered_ends = [TableStructure._cumulative_max_ends(strokes, 'col') for strokes in ordered_strokes]
         for row in self.cells:
             ref_y = (row[0].bbox.y0+row[0].bbox.y1)/2.0
-            row_structure = TableStructure._check_merged_cells(ref_y, ordered_strokes, 'row')
+            row_structure = TableStructure._check_merged_cells(ref_y, ordered_strokes, 'row', ordered_ends)
             merged_cells_rows.append(row_structure)
 
         # check cell merging status in each column
         merged_cells_cols = []  # type: list[list[int]]
         ordered_strokes = [self.h_strokes[k] for k in y_rows]
+        ordered_ends = [TableStructure._cumulative_max_ends(strokes, 'row') for strokes in ordered_strokes]
         for cell in self.cells[0]:
             ref_x = (cell.bbox.x0+cell.bbox.x1)/2.0
-            col_structure = TableStructure._check_merged_cells(ref_x, ordered_strokes, 'column')
+            col_structure = TableStructure._check_merged_cells(ref_x, ordered_strokes, 'column', ordered_ends)
             merged_cells_cols.append(col_structure)
 
         # count merged cells in row and column directions
+        n_cols = [TableStructure._count_merged_cells_all(status) for status in merged_cells_rows]
+        n_rows = [TableStructure._count_merged_cells_all(status) for status in merged_cells_cols]
         for i in range(self.num_rows):
             for j in range(self.num_cols):
-                cell = self.cells[i][j]
-                n_col = TableStructure._count_merged_cells(merged_cells_rows[i][j:])
-                n_row = TableStructure._count_merged_cells(merged_cells_cols[j][i:])                
-                cell.merged_cells = (n_row, n_col)        
+                self.cells[i][j].merged_cells = (n_rows[j][i], n_cols[i][j])
 
         # check whether merged region is valid
         for i in range(self.num_rows):
@@ -516,13 +556,26 @@ class TableStructure:
 
 
     @staticmethod
-    def _check_merged_cells(ref:float, borders:list, direction:str='row'):
+    def _cumulative_max_ends(strokes:Shapes, direction:str='row'):
+        '''Cumulative max of the end coordinates of strokes, i.e. x1 for ``row`` direction 
+        (horizontal strokes) and y1 for ``col`` direction (vertical strokes). 
+        
+        Given strokes in order, the first ``bisect_right(ends, t)`` strokes all end before ``t``.
+        '''
+        idx = 2 if direction=='row' else 3
+        return list(accumulate((stroke.bbox[idx] for stroke in strokes), max))
+
+
+    @staticmethod
+    def _check_merged_cells(ref:float, borders:list, direction:str='row', ends:list=None):
         '''Check merged cells in a row/column. 
         
         Args:
             * ref (float): y (or x) coordinate of horizontal (or vertical) passing-through line.
             * borders (list[Shapes]): A list of vertical (or horizontal) rects list in a column (or row).
             * direction (str): ``row`` - check merged cells in row; ``column`` - check merged cells in a column.
+            * ends (list[list], optional): Cumulative max of the end coordinates of each group of 
+              ``borders``, to skip borders locating before the reference line quickly.
 
         Taking cells in a row for example, give a horizontal line ``y=ref`` passing through this row, 
         check the intersection with vertical borders. The ``n-th`` cell is merged if no intersection 
@@ -539,10 +592,13 @@ class TableStructure:
                 +-----------+-----+
         '''
         res = [] # type: list[int]
-        for shapes in borders[0:-1]:
+        for k, shapes in enumerate(borders[0:-1]):
+            # skip borders with ref1<=ref, which fall into case 2) below
+            start = bisect_right(ends[k], ref) if ends else 0
+
             # NOTE: shapes MUST be sorted in reading order!!
             # multi-lines exist in a row/column
-            for border in shapes:
+            for border in shapes[start:]:
                 # reference coordinates depending on checking direction
                 if direction=='row':
                     ref0, ref1 = border.y0, border.y1
@@ -573,6 +629,19 @@ class TableStructure:
         return res
 
 
+    @staticmethod
+    def _count_merged_cells_all(merging_status:list):
+        '''Count merged cells starting from each position of the merging status list, i.e. 
+        ``_count_merged_cells(merging_status[i:])`` for each ``i``, e.g. ``[1,0,0,1]`` -> ``[3,0,0,1]``.
+        '''
+        res = []
+        zeros = 0 # count of continuous 0 status after current position
+        for val in reversed(merging_status):
+            res.append(0 if val==0 else zeros+1)
+            zeros = zeros+1 if val==0 else 0
+        return res[::-1]
+
+
     @staticmethod
     def _count_merged_cells(merging_status:list):
         '''Count merged cells, 
@@ -19,9 +19,11 @@ Terms definition:
   and finally applied to detect table border.
 '''
 
+from bisect import (bisect_left, bisect_right)
 from ..common import constants
 from ..common.Element import Element
 from ..common.Collection import Collection
+from ..page.PageBudget import check_budget
 from ..layout.Blocks import Blocks
 from ..shape.Shapes import Shapes
 from ..text.Lines import Lines
@@ -121,7 +123,10 @@ class TablesConstructor:
         tables_lines = self._blocks.collect_stream_lines(table_fillings, line_separate_threshold)            
 
         # define a function to get the vertical boundaries of given table
+        # NOTE: sort block bottoms and tops once, so each query is a binary search
         X0, Y0, X1, Y1 = self._parent.bbox
+        blocks_y0 = sorted(block.bbox.y0 for block in self._blocks)
+        blocks_y1 = sorted(block.bbox.y1 for block in self._blocks)
         def top_bottom_boundaries(y0, y1):
             '''find the vertical boundaries of table in y-range [y0, y1]:
                 - the bottom of block closest to y0
@@ -143,15 +148,14 @@ class TablesConstructor:
                 +---------------------------+ <- Y1
                 ```
             '''
-            y_lower, y_upper = Y0, Y1
-            for block in self._blocks:
-                # move top border
-                if block.bbox.y1 < y0: y_lower = block.bbox.y1
-
-                # reach first bottom border
-                if block.bbox.y0 > y1:
-                    y_upper = block.bbox.y0
-                    break
+            # the largest bottom above y0
+            i = bisect_left(blocks_y1, y0)
+            y_lower = blocks_y1[i-1] if i>0 else Y0
+
+            # the smallest top below y1
+            j = bisect_right(blocks_y0, y1)
+            y_upper = blocks_y0[j] if j<len(blocks_y0) else Y1
+
             return y_lower, y_upper
 
         # parse tables
@@ -162,12 +166,15 @@ class TablesConstructor:
         }
 
         for table_lines in tables_lines:
+            check_budget()
             if not table_lines: continue
             # bounding box
-            x0 = min([rect.bbox.x0 for rect in table_lines])
-            y0 = min([rect.bbox.y0 for rect in table_lines])
-            x1 = max([rect.bbox.x1 for rect in table_lines])
-            y1 = max([rect.bbox.y1 for rect in table_lines])
+            x0, y0, x1, y1 = float('inf'), float('inf'), -float('inf'), -float('inf')
+            for rect in table_lines:
+                x0 = min(x0, rect.bbox.x0)
+                y0 = min(y0, rect.bbox.y0)
+                x1 = max(x1, rect.bbox.x1)
+                y1 = max(y1, rect.bbox.y1)
             
             # boundary borders to be finalized
             y0_margin, y1_margin = top_bottom_boundaries(y0, y1)
@@ -314,6 +321,7 @@ class TablesConstructor:
             outer_borders (tuple): Boundary borders of table region.
         '''
         # trying: deep into cells
+        check_budget() # recursion might be deep for a large region
         cols_lines = lines.group_by_columns()
         group_lines = [col_lines.group_by_rows(factor=constants.FACTOR_A_FEW) for col_lines in cols_lines]
 
@@ -9,6 +9,7 @@ from .Line import Line
 from .TextSpan import TextSpan
 from ..image.ImageSpan import ImageSpan
 from ..common.Collection import ElementCollection
+from ..common.algorithm import IntervalIndex
 from ..common.share import TextAlignment
 from ..common import constants
 
@@ -140,43 +141,57 @@ class Lines(ElementCollection):
         
         for i, line in enumerate(self._instances[:-1]):
             # last char in this line
+            # NOTE: check text of chars only, so as not to create chars of span
             end_span = line.spans[-1]
             if not isinstance(end_span, TextSpan): continue
-            end_chars = end_span.chars
-            if not end_chars: continue 
-            end_char = end_chars[-1]
+            end_char = end_span.last_char
+            if not end_char: continue 
 
             # first char in next line
             start_span = self._instances[i+1].spans[0]
             if not isinstance(start_span, TextSpan): continue
-            start_chars = start_span.chars
-            if not start_chars: continue 
-            next_start_char = start_chars[0]            
+            next_start_char = start_span.first_char
+            if not next_start_char: continue 
 
             # delete hyphen if next line starts with lower case letter
             if delete_end_line_hyphen and \
-                end_char.c.endswith('-') and next_start_char.c.islower(): 
-                end_char.c = '' # delete hyphen in a tricky way
+                end_char.endswith('-') and next_start_char.islower(): 
+                end_char = end_span.last_char = '' # delete hyphen in a tricky way
 
 
             # add a space if both the last char and the first char in next line are alphabet,  
             # number, or English punctuation (excepting hyphen)
-            if is_end_of_english_word(end_char.c) and is_end_of_english_word(next_start_char.c):
-                end_char.c += ' ' # add blank in a tricky way
+            if is_end_of_english_word(end_char) and is_end_of_english_word(next_start_char):
+                end_span.last_char = end_char + ' ' # add blank in a tricky way
 
 
-    def parse_text_format(self, shape):
+    def expanded_y_index(self, dt:float):
+        '''Index of lines by the y-range of expanded bbox.
+
+        Args:
+            dt (float): Expanding margin.
+
+        Returns:
+            IntervalIndex: Index to query lines overlapped with a given y-range.
+        '''
+        return IntervalIndex([(line.bbox.y0-dt, line.bbox.y1+dt) for line in self._instances])
+
+
+    def parse_text_format(self, shape, indexes:list=None):
         '''Parse text format with style represented by rectangle shape.
         
         Args:
             shape (Shape): Potential style shape applied on blocks.
+            indexes (list, optional): Indexes of candidate lines, e.g. queried from 
+                ``expanded_y_index()``. Defaults to None, i.e. all lines.
         
         Returns:
             bool: Whether a valid text style.
         '''
         flag = False
 
-        for line in self._instances:
+        lines = self._instances if indexes is None else [self._instances[i] for i in indexes]
+        for line in lines:
             # any intersection in this line?
             expanded_bbox = line.get_expand_bbox(constants.MAJOR_DIST)
             if not shape.bbox.intersects(expanded_bbox): 
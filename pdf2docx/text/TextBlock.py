@@ -25,15 +25,12 @@ Data structure based on this `link <https://pymupdf.readthedocs.io/en/latest/tex
     }
 '''
 
-from docx.shared import (Pt,Inches)
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 from .Lines import Lines
 from ..image.ImageSpan import ImageSpan
 from ..common.share import (RectType, TextAlignment, lower_round)
 from ..common.Block import Block
 from ..common.share import (rgb_component_from_name, lower_round)
 from ..common import constants
-from ..common import docx
 
 
 class TextBlock(Block):
@@ -149,6 +146,7 @@ class TextBlock(Block):
             shapes (Shapes): Shapes representing potential styles applied on blocks.
         '''
         flag = False
+        index = None
 
         # use each rectangle (a specific text format) to split line spans
         for shape in shapes:
@@ -160,8 +158,10 @@ class TextBlock(Block):
             # any intersection with current block?
             if not self.bbox.intersects(shape.bbox): continue
 
-            # yes, then go further to lines in block
-            if self.lines.parse_text_format(shape):
+            # yes, then go further to the vertically overlapped lines in block
+            if index is None: index = self.lines.expanded_y_index(constants.MAJOR_DIST)
+            indexes = index.query(shape.bbox.y0, shape.bbox.y1)
+            if self.lines.parse_text_format(shape, indexes):
                 flag = True
 
         return flag
@@ -303,6 +303,10 @@ class TextBlock(Block):
         .. note::
             The left position of paragraph is set by paragraph indent, rather than ``TAB`` stop.
         '''
+        from docx.shared import (Pt,Inches)
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from ..common import docx
+
         pf = docx.reset_paragraph_format(p)
 
         # ------------------------------------
@@ -30,13 +30,12 @@ this `link <https://pymupdf.readthedocs.io/en/latest/textpage.html>`_::
 '''
 
 import fitz
-from docx.shared import Pt, RGBColor
-from docx.oxml.ns import qn
 from .Char import Char
 from ..common.Element import Element
 from ..common.share import RectType
 from ..common import constants
-from ..common import share, docx
+from ..common.constants import INVALID_CHARS
+from ..common import share
 from ..shape.Shape import Shape
 
 
@@ -47,9 +46,11 @@ class TextSpan(Element):
         self.color = raw.get('color', 0)
         self.flags = raw.get('flags', 0)
 
-        # filter empty chars
-        chars = [Char(c) for c in raw.get('chars', [])] # type: list[Char]
-        self.chars = [char for char in chars if char.c!='']
+        # filter empty chars, and keep raw chars until they're really needed since creating
+        # Char instances is costly, while most spans are used as a whole
+        self._raw_chars = [c for c in raw.get('chars', []) if c.get('c', '') not in INVALID_CHARS]
+        self._chars = None # type: list[Char]
+        self._rotation_matrix = Element.get_rotation_matrix() if self._raw_chars else None
         self._text = raw.get('text', '') # not an original key from PyMuPDF
 
         # font metrics
@@ -78,10 +79,47 @@ class TextSpan(Element):
             self._change_font_and_update_bbox(constants.DEFAULT_FONT_NAME)
 
 
+    @property
+    def chars(self):
+        '''Chars in span, which are created from raw chars when accessed for the first time.'''
+        if self._chars is None:
+            with Element.rotation_context(self._rotation_matrix):
+                self._chars = [Char(c) for c in self._raw_chars]
+            self._raw_chars = []
+        return self._chars
+
+    @chars.setter
+    def chars(self, chars:list):
+        self._chars = chars
+        self._raw_chars = []
+
+    @property
+    def first_char(self):
+        '''Text of the first char, without creating chars.'''
+        if self._chars is not None: return self._chars[0].c if self._chars else ''
+        return self._raw_chars[0]['c'] if self._raw_chars else ''
+
+    @property
+    def last_char(self):
+        '''Text of the last char, without creating chars.'''
+        if self._chars is not None: return self._chars[-1].c if self._chars else ''
+        return self._raw_chars[-1]['c'] if self._raw_chars else ''
+
+    @last_char.setter
+    def last_char(self, c:str):
+        if self._chars is not None:
+            self._chars[-1].c = c
+        else: # keep the extracted raw dict untouched
+            self._raw_chars[-1] = dict(self._raw_chars[-1], c=c)
+
     @property
     def text(self):
         '''Get span text. Note joining chars is in a higher priority.'''
-        return ''.join([char.c for char in self.chars]) if self.chars else self._text
+        if self._chars is not None:
+            chars = [char.c for char in self._chars]
+        else:
+            chars = [char['c'] for char in self._raw_chars]
+        return ''.join(chars) if chars else self._text
 
     @text.setter
     def text(self, value):
@@ -348,8 +386,10 @@ class TextSpan(Element):
             return TextSpan()
 
         # further check chars in span
+        # NOTE: detach chars before copying, to avoid deep copying chars to be cleared anyway
+        chars, self.chars = self.chars, []
         span = self.copy()
-        span.chars.clear()
+        self.chars = chars
         span.update_bbox((0.0,0.0,0.0,0.0))
 
         for char in self.chars:
@@ -368,6 +408,8 @@ class TextSpan(Element):
             underline, the text and uri is parsed as hyperlink itself, while the underline is treated as a normal text
             style.
         '''
+        from ..common import docx
+
         # Create hyperlink in particular, otherwise add a run directly
         for style in self.style:
             if style['type']==RectType.HYPERLINK.value and self.text.strip():
@@ -386,6 +428,10 @@ class TextSpan(Element):
 
     def _set_text_format(self, docx_run):
         '''Set text format for ``python-docx.run`` object.'''
+        from docx.shared import Pt, RGBColor
+        from docx.oxml.ns import qn
+        from ..common import docx
+
         # set style
         # https://python-docx.readthedocs.io/en/latest/api/text.html#docx.text.run.Font
 
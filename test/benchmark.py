@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+
+'''
+Performance benchmark for the converting process.
+
+A set of synthetic PDF files is generated with ``PyMuPDF`` on the fly, so the benchmark runs
+offline on CPU only, without any sample file or network access. Each case stresses a typical
+workload of the converter:
+
+- ``dense_text``  : two-column pages full of short text lines.
+- ``table``       : lattice tables built from explicit stroke lines.
+- ``images``      : many small raster images.
+- ``vector``      : curves and polygons, i.e. vector graphics to be clipped as images.
+- ``rotated``     : rotated pages with text and table strokes.
+- ``hidden_text`` : scanned page image covered by an invisible (OCR) text layer.
+
+Besides the end-to-end time of ``Converter.parse`` and ``Converter.make_docx``, the cumulative
+time of some hotspots, e.g. ``Collection.group``, ``solve_rects_intersection``,
+``recursive_xy_cut`` and ``TableStructure.parse``, is collected by wrapping these functions
+during conversion.
+
+The startup cost, i.e. time to import the package and the converter, is measured in a fresh
+interpreter with ``python -X importtime``, which also reports the heavy dependencies loaded.
+
+The timing results can be stored as baseline, and compared with the baseline afterwards to flag
+any regression. Since absolute time depends on the machine, each time is stored as multiple of
+a calibration time, i.e. a fixed pure Python workload measured in the same run, e.g.
+
+- python test/benchmark.py --save     # run and store results to the baseline file
+- python test/benchmark.py --check    # run and exit with non-zero code if any regression
+- python test/benchmark.py --cases table,vector --repeat 5
+- python test/benchmark.py --cases startup
+'''
+
+import os
+import sys
+import json
+import random
+import logging
+import argparse
+import tempfile
+import subprocess
+from io import BytesIO
+from time import perf_counter
+from functools import wraps
+from collections import defaultdict
+
+import fitz
+
+script_path = os.path.abspath(__file__) # current script path
+test_dir = os.path.dirname(script_path)
+sys.path.insert(0, os.path.dirname(test_dir)) # run from source tree
+
+from pdf2docx import Converter
+from pdf2docx.common import Collection
+from pdf2docx.image import ImagesExtractor
+from pdf2docx.table.TableStructure import TableStructure
+
+
+baseline_file = os.path.join(test_dir, 'benchmark_baseline.json')
+
+
+# -------------------------------------------------------------------------------------------
+# synthetic pdf files
+# -------------------------------------------------------------------------------------------
+def _text_lines(rnd:random.Random, num:int, words=(2, 8)):
+    '''Random text lines composed of lower case words.'''
+    def word(): return ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rnd.randint(2, 9)))
+    return [' '.join(word() for _ in range(rnd.randint(*words))) for _ in range(num)]
+
+
+def _draw_grid(page, x0:float, y0:float, num_rows:int, num_cols:int, w:float, h:float):
+    '''Draw a lattice table with stroke lines, and return the cell rects.'''
+    x1, y1 = x0+num_cols*w, y0+num_rows*h
+    for i in range(num_rows+1):
+        page.draw_line((x0, y0+i*h), (x1, y0+i*h), width=0.5)
+    for j in range(num_cols+1):
+        page.draw_line((x0+j*w, y0), (x0+j*w, y1), width=0.5)
+    return [fitz.Rect(x0+j*w, y0+i*h, x0+(j+1)*w, y0+(i+1)*h) \
+                for i in range(num_rows) for j in range(num_cols)]
+
+
+def make_dense_text(doc, rnd, num_pages=3):
+    for _ in range(num_pages):
+        page = doc.new_page()
+        for x in (50, 310):
+            lines = _text_lines(rnd, 60, words=(2, 5))
+            for i, text in enumerate(lines):
+                page.insert_text((x, 60+i*12), text, fontsize=8)
+
+
+def make_table(doc, rnd, num_pages=2):
+    for _ in range(num_pages):
+        page = doc.new_page()
+        cells = _draw_grid(page, 50, 60, 30, 6, 82, 22)
+        for rect, text in zip(cells, _text_lines(rnd, len(cells), words=(1, 2))):
+            page.insert_text((rect.x0+3, rect.y0+14), text[:14], fontsize=8)
+
+
+def make_images(doc, rnd, num_pages=2):
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 16, 16), False)
+    for _ in range(num_pages):
+        page = doc.new_page()
+        for i in range(8):
+            for j in range(6):
+                pix.clear_with(rnd.randint(0, 255))
+                rect = fitz.Rect(50+j*85, 60+i*90, 50+j*85+60, 60+i*90+60)
+                page.insert_image(rect, pixmap=pix)
+                page.insert_text((rect.x0, rect.y1+12), _text_lines(rnd, 1, (1, 2))[0], fontsize=8)
+
+
+def make_vector(doc, rnd, num_pages=2):
+    for _ in range(num_pages):
+        page = doc.new_page()
+        page.insert_text((50, 50), _text_lines(rnd, 1)[0], fontsize=10)
+        for i in range(4):
+            for j in range(3):
+                x, y = 80+j*170, 100+i*170
+                page.draw_circle((x, y), 40, color=(0,0,1), fill=(rnd.random(), 0.5, 0.5))
+                page.draw_bezier((x-60, y+50), (x-20, y-60), (x+20, y+100), (x+60, y+50))
+                page.draw_polyline([(x-50, y-50), (x+10, y-30), (x+50, y-60)], color=(1,0,0))
+
+
+def make_rotated(doc, rnd, num_pages=2):
+    for k in range(num_pages):
+        page = doc.new_page()
+        lines = _text_lines(rnd, 25)
+        for i, text in enumerate(lines):
+            page.insert_text((50, 60+i*14), text, fontsize=10)
+        _draw_grid(page, 50, 450, 10, 4, 120, 20)
+        page.set_rotation(90 if k%2==0 else 270)
+
+
+def make_hidden_text(doc, rnd, num_pages=2):
+    # a gray "scanned" image covering the whole page
+    pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 300, 400), False)
+    pix.clear_with(230)
+    for _ in range(num_pages):
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=pix)
+        for i, text in enumerate(_text_lines(rnd, 50)):
+            page.insert_text((50, 60+i*14), text, fontsize=10, render_mode=3)
+
+
+CASES = {
+    'dense_text' : make_dense_text,
+    'table'      : make_table,
+    'images'     : make_images,
+    'vector'     : make_vector,
+    'rotated'    : make_rotated,
+    'hidden_text': make_hidden_text,
+}
+
+
+def generate_pdf(name:str, seed:int=0):
+    '''Generate synthetic pdf file in memory.'''
+    doc = fitz.open()
+    CASES[name](doc, random.Random(seed))
+    stream = doc.tobytes()
+    doc.close()
+    return stream
+
+
+# -------------------------------------------------------------------------------------------
+# timing
+# -------------------------------------------------------------------------------------------
+# functions to collect cumulative time: (owner, attribute name, metric name)
+HOTSPOTS = [
+    (Collection.Collection, 'group', 'Collection.group'),
+    (Collection, 'solve_rects_intersection', 'solve_rects_intersection'),
+    (ImagesExtractor, 'recursive_xy_cut', 'recursive_xy_cut'),
+    (TableStructure, 'parse', 'TableStructure.parse'),
+]
+
+
+class Timer:
+    '''Collect cumulative time of hotspot functions by wrapping them temporarily.'''
+
+    def __init__(self, hotspots:list=None):
+        self.hotspots = hotspots or HOTSPOTS
+        self.records = defaultdict(float)
+        self._origins = []
+        self._depth = defaultdict(int)
+
+    def __enter__(self):
+        for owner, attr, name in self.hotspots:
+            fun = getattr(owner, attr)
+            self._origins.append((owner, attr, fun))
+            setattr(owner, attr, self._wrap(fun, name))
+        return self
+
+    def __exit__(self, *args):
+        for owner, attr, fun in reversed(self._origins):
+            setattr(owner, attr, fun)
+        self._origins.clear()
+
+    def _wrap(self, fun, name):
+        @wraps(fun)
+        def inner(*args, **kwargs):
+            # count the outermost call only for nested/recursive calls
+            self._depth[name] += 1
+            t0 = perf_counter()
+            try:
+                return fun(*args, **kwargs)
+            finally:
+                self._depth[name] -= 1
+                if not self._depth[name]: self.records[name] += perf_counter()-t0
+        return inner
+
+
+def run_case(name:str, repeat:int=3):
+    '''Convert the synthetic pdf of given case, and return the minimum time of each metric.'''
+    stream = generate_pdf(name)
+    results = {}
+    for _ in range(repeat):
+        with Timer() as timer:
+            cv = Converter(stream=stream)
+            settings = cv.default_settings
+            t0 = perf_counter()
+            cv.parse(**settings)
+            t1 = perf_counter()
+            cv.make_docx(BytesIO(), **settings)
+            t2 = perf_counter()
+            cv.close()
+
+        records = dict(timer.records)
+        records.update({'Converter.parse': t1-t0, 'Converter.make_docx': t2-t1})
+        for metric, t in records.items():
+            results[metric] = min(t, results.get(metric, float('inf')))
+
+    return results
+
+
+# -------------------------------------------------------------------------------------------
+# startup
+# -------------------------------------------------------------------------------------------
+# statements to import, and heavy dependencies to watch
+STARTUP_STATEMENTS = {
+    'import pdf2docx'               : 'import pdf2docx',
+    'from pdf2docx import Converter': 'from pdf2docx import Converter',
+}
+HEAVY_MODULES = ('fitz', 'docx', 'fontTools', 'numpy', 'cv2')
+
+
+def import_time(statement:str):
+    '''Import time of given statement in a fresh interpreter.
+
+    Returns:
+        tuple: Time in seconds, and a list of the heavy dependencies imported.
+    '''
+    code = f'import time; t=time.perf_counter(); {statement}; print(time.perf_counter()-t)'
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(test_dir))
+    res = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], 
+                    capture_output=True, text=True, env=env, check=True)
+
+    # stderr lines: import time: self [us] | cumulative | imported package
+    modules = {line.rsplit('|', 1)[-1].strip() for line in res.stderr.splitlines()}
+    heavy = [name for name in HEAVY_MODULES if name in modules]
+    return float(res.stdout.strip().splitlines()[-1]), heavy
+
+
+def run_startup(repeat:int=3):
+    results = {}
+    for metric, statement in STARTUP_STATEMENTS.items():
+        times = []
+        for _ in range(repeat):
+            t, heavy = import_time(statement)
+            times.append(t)
+        results[metric] = min(times)
+        print(f'{statement}: {", ".join(heavy) or "no heavy dependency"}')
+    return results
+
+
+# -------------------------------------------------------------------------------------------
+# calibration
+# -------------------------------------------------------------------------------------------
+def _calibration_workload(num:int=20000):
+    '''Fixed pure Python workload independent of pdf2docx, e.g. rects intersection in a loop.'''
+    rnd = random.Random(0)
+    rects = sorted((x, y, x+rnd.random()*20, y+rnd.random()*20) \
+                    for x, y in ((rnd.random()*500, rnd.random()*800) for _ in range(num)))
+    count = 0
+    for i, (x0, y0, x1, y1) in enumerate(rects):
+        for u0, v0, u1, v1 in rects[i+1:i+20]:
+            if u0<x1 and v0<y1 and y0<v1: count += 1
+    return count
+
+
+def calibrate(repeat:int=5):
+    '''Time unit of the benchmark on current machine: minimum time of the calibration workload.'''
+    times = []
+    for _ in range(repeat):
+        t0 = perf_counter()
+        _calibration_workload()
+        times.append(perf_counter()-t0)
+    return min(times)
+
+
+def normalize(results:dict, unit:float):
+    '''Convert timing results in seconds to multiples of the calibration time.'''
+    return {case: {metric: t/unit for metric, t in values.items()} \
+                for case, values in results.items()}
+
+
+# -------------------------------------------------------------------------------------------
+# baseline
+# -------------------------------------------------------------------------------------------
+def load_baseline(filename:str=baseline_file):
+    if not os.path.exists(filename): return {}
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results:dict, filename:str=baseline_file):
+    data = {case: {metric: round(t, 6) for metric, t in values.items()} \
+                for case, values in results.items()}
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, indent=4, sort_keys=True))
+
+
+def compare(results:dict, baseline:dict, tolerance:float=0.5, min_delta:float=0.01):
+    '''Compare results with baseline.
+
+    Args:
+        results (dict): Normalized timing results, ``{case: {metric: multiple of calibration time}}``.
+        baseline (dict): Baseline results in same format.
+        tolerance (float): Regression if the time exceeds baseline by this ratio.
+        min_delta (float): Ignore differences lower than this value, i.e. noise.
+
+    Returns:
+        list: Regressions in format ``(case, metric, baseline, current)``.
+    '''
+    regressions = []
+    for case, metrics in results.items():
+        for metric, t in metrics.items():
+            t0 = baseline.get(case, {}).get(metric)
+            if t0 is None: continue
+            if t > t0*(1.0+tolerance) and t-t0 > min_delta:
+                regressions.append((case, metric, t0, t))
+    return regressions
+
+
+def report(results:dict, baseline:dict, unit:float):
+    '''Print time in ms, and the ratio to baseline, where both are normalized by calibration time.'''
+    print(f'calibration: {unit*1000:.1f} ms')
+    metrics = sorted({m for values in results.values() for m in values})
+    for case, values in results.items():
+        print(f'\n{case}')
+        for metric in metrics:
+            if metric not in values: continue
+            t, t0 = values[metric], baseline.get(case, {}).get(metric)
+            ratio = f'{t/t0:6.2f}x' if t0 else '      -'
+            print(f'  {metric:<32}{t*unit*1000:10.1f} ms {ratio}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark pdf2docx with synthetic pdf files.')
+    parser.add_argument('--cases', default=','.join(list(CASES)+['startup']), help='comma separated case names')
+    parser.add_argument('--repeat', type=int, default=3, help='repeat times of each case')
+    parser.add_argument('--baseline', default=baseline_file, help='baseline json file')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed slowdown ratio')
+    parser.add_argument('--save', action='store_true', help='store results as baseline')
+    parser.add_argument('--check', action='store_true', help='exit with code 1 if any regression')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING) # mute conversion logs
+    baseline = load_baseline(args.baseline)
+    results = {}
+    unit = calibrate() # and again after running cases, in case of warming up
+
+    # run in temporary directory to avoid any file written to current path
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for case in args.cases.split(','):
+                case = case.strip()
+                if case=='startup':
+                    results[case] = run_startup(args.repeat)
+                else:
+                    results[case] = run_case(case, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+    unit = min(unit, calibrate())
+    results = normalize(results, unit)
+    report(results, baseline, unit)
+
+    if args.save:
+        baseline.update(results)
+        save_baseline(baseline, args.baseline)
+        print(f'\nBaseline saved to {args.baseline}')
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, min_delta=0.01/unit)
+    for case, metric, t0, t in regressions:
+        print(f'[REGRESSION] {case}: {metric} {t0*unit*1000:.1f} ms -> {t*unit*1000:.1f} ms')
+
+    return 1 if (args.check and regressions) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -28,6 +28,7 @@ import numpy as np
 import cv2 as cv
 import fitz
 from pdf2docx import Converter, parse
+from pdf2docx.ocr.OCREngine import OCREngine
 
 
 script_path = os.path.abspath(__file__) # current script path
@@ -99,6 +100,16 @@ def get_mssism(i1, i2, kernel=(15,15)):
 
 
 
+class FakeOCREngine(OCREngine):
+    '''OCR engine recognizing a fixed word at the center of image.'''
+    name = 'fake'
+    def recognize(self, image:bytes, dpi:int):
+        pix = fitz.Pixmap(image)
+        x, y = pix.width//2, pix.height//2
+        return [{'text': 'Hello', 'bbox': (x, y, x+dpi, y+dpi//6), 'block': 0, 'line': 0, 'conf': 90.0}]
+
+
+
 class TestConversion:
     '''Test the converting process.'''
 
@@ -126,6 +137,19 @@ class TestConversion:
         '''test page layout: section vertical position.'''
         self.convert('demo-section-spacing')
 
+    def test_section_projection(self):
+        '''test detecting sections by projection profile: same sections and columns.'''
+        def sections(**kwargs):
+            cv = Converter(os.path.join(sample_path, 'demo-section.pdf'))
+            settings = cv.default_settings
+            settings.update(kwargs)
+            cv.parse(**settings)
+            cv.close()
+            return [[column.bbox for column in section] \
+                for page in cv.pages for section in page.sections]
+
+        assert sections(section_detection='projection')==sections()
+
     # ------------------------------------------
     # text styles
     # ------------------------------------------
@@ -180,6 +204,32 @@ class TestConversion:
         '''test images with both intersection and page rotation.'''
         self.convert('demo-image-overlap')
 
+    def test_float_image(self):
+        '''test floating image: images covered by text lines are kept as floating images, while
+        the text lines are kept in flow layout.'''
+        doc = fitz.open()
+        page = doc.new_page()
+        icon = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), False)
+        icon.clear_with(0)
+        picture = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 100, 100), False)
+        picture.clear_with(128)
+        page.insert_text((72, 100), 'Click the icon         to continue.', fontsize=12)
+        page.insert_image(fitz.Rect(140, 91, 148, 99), pixmap=icon)
+        page.insert_image(fitz.Rect(300, 200, 400, 300), pixmap=picture)
+        page.insert_text((280, 250), 'Text over a large picture.', fontsize=12)
+        stream = doc.tobytes()
+        doc.close()
+
+        cv = Converter(stream=stream)
+        cv.parse(**cv.default_settings)
+        page = cv.pages[0]
+        cv.close()
+        floats = sorted(tuple(round(x) for x in image.bbox) for image in page.float_images)
+        assert floats==[(140, 91, 148, 99), (300, 200, 400, 300)]
+        texts = [block.text for section in page.sections for column in section \
+                    for block in column.blocks if block.is_text_block]
+        assert texts==['Click the icon         to continue.', 'Text over a large picture.']
+
 
     # ------------------------------------------
     # table styles
@@ -274,6 +324,244 @@ class TestConversion:
 
         # check file        
         assert os.path.isfile(docx_file)
+
+    def test_multi_threading(self):
+        '''test parsing pages with a thread pool, which should be same to parsing in sequence.'''
+        pdf_file = os.path.join(sample_path, 'demo.pdf')
+        layouts = []
+        for multi_threading in (False, True):
+            cv = Converter(pdf_file)
+            settings = dict(cv.default_settings, multi_threading=multi_threading, cpu_count=2)
+            cv.parse(start=1, end=5, **settings)
+            layouts.append([page.store() for page in cv.pages if page.finalized])
+            cv.close()
+        assert layouts[0]==layouts[1]
+
+    def test_pipeline(self):
+        '''test converting pages in pipeline, which should be same to converting in sequence.'''
+        pdf_file = os.path.join(sample_path, 'demo.pdf')
+        layouts = []
+        for pipeline in (False, True):
+            docx_file = os.path.join(output_path, f'demo-pipeline-{pipeline}.docx')
+            cv = Converter(pdf_file)
+            cv.convert(docx_file, start=1, end=5, pipeline=pipeline)
+            layouts.append([page.store() for page in cv.pages if page.finalized])
+            cv.close()
+            assert os.path.isfile(docx_file)
+        assert layouts[0]==layouts[1]
+
+    def test_pipeline_header_footer(self):
+        '''test detecting header/footer in pipeline with a look-ahead window of parsed pages.'''
+        pdf_file = os.path.join(output_path, 'header_footer.pdf')
+        doc = fitz.open()
+        for i in range(6):
+            page = doc.new_page()
+            page.insert_text((72, 40), 'Annual Report' if i<5 else 'Appendix')
+            for k in range(8):
+                page.insert_text((72, 200+k*20), f'Left column {k} of page {i}.')
+                page.insert_text((320, 200+k*20), f'Right column {k} of page {i}.')
+            page.insert_text((280, 800), f'Page {i+1}')
+        doc.save(pdf_file)
+        doc.close()
+
+        def flags(pages):
+            return [[(block.is_header, block.is_footer) for section in page.sections
+                        for column in section for block in column.blocks]
+                            for page in pages if page.finalized]
+
+        docx_file = os.path.join(output_path, 'header_footer.docx')
+        results = []
+        for lookahead in (1, 0):
+            cv = Converter(pdf_file)
+            cv.convert(docx_file, pipeline=True, pipeline_lookahead=lookahead)
+            results.append(flags(cv.pages))
+            cv.close()
+
+        # same to the whole document, e.g. the different header of last page is not marked
+        cv = Converter(pdf_file)
+        cv.parse(**cv.default_settings)
+        cv.pages.extract_header_footer()
+        assert results[0]==flags(cv.pages)
+        assert results[0][0][0]==(True, False) and results[0][-1][0]==(False, False)
+        cv.close()
+
+        # a single page is compared with itself only
+        assert results[1][-1][0]==(True, False)
+
+    def test_batch(self):
+        '''test converting a directory of pdf files, largest first, then resuming from status log.'''
+        import json, shutil
+        from pdf2docx.batch import convert_batch
+        batch_path = os.path.join(output_path, 'batch')
+        if os.path.exists(batch_path): shutil.rmtree(batch_path)
+        source, target = os.path.join(batch_path, 'pdf'), os.path.join(batch_path, 'docx')
+        log_file = os.path.join(batch_path, 'status.jsonl')
+
+        # one-page and three-page files, and a broken one
+        for name, num in (('one.pdf', 1), ('sub/three.pdf', 3)):
+            filename = os.path.join(source, name)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            doc = fitz.open()
+            for i in range(num): doc.new_page().insert_text((72, 72), f'Page {i+1}')
+            doc.save(filename)
+            doc.close()
+        with open(os.path.join(source, 'broken.pdf'), 'wb') as f: f.write(b'not a pdf')
+
+        summary = convert_batch(source, target, log_file, workers=1)
+        assert summary=={'ok': 2, 'error': 1, 'skipped': 0}
+        assert os.path.isfile(os.path.join(target, 'one.docx'))
+        assert os.path.isfile(os.path.join(target, 'sub', 'three.docx'))
+        with open(log_file, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert [record['pages'] for record in records]==[3, 1, 0] # largest first
+
+        # converted files are skipped, while the failed one is tried again
+        summary = convert_batch(source, target, log_file, workers=1)
+        assert summary=={'ok': 0, 'error': 1, 'skipped': 2}
+
+        # files with same name from glob pattern keep their paths relative to the glob root
+        shutil.copy(os.path.join(source, 'one.pdf'), os.path.join(source, 'sub', 'one.pdf'))
+        pattern, glob_target = os.path.join(source, '**', 'one.pdf'), os.path.join(batch_path, 'glob')
+        summary = convert_batch(pattern, glob_target, workers=1)
+        assert summary=={'ok': 2, 'error': 0, 'skipped': 0}
+        assert os.path.isfile(os.path.join(glob_target, 'one.docx'))
+        assert os.path.isfile(os.path.join(glob_target, 'sub', 'one.docx'))
+
+        # files outside manifest folder are written by name, which is rejected if duplicated
+        manifest = os.path.join(batch_path, 'manifest', 'files.txt')
+        os.makedirs(os.path.dirname(manifest))
+        with open(manifest, 'w', encoding='utf-8') as f:
+            f.write('../pdf/one.pdf\n../pdf/sub/one.pdf\n')
+        try:
+            convert_batch(manifest, glob_target, workers=1)
+        except ValueError:
+            pass
+        else:
+            assert False, 'duplicated target is not rejected'
+
+    def test_page_budget(self):
+        '''test falling back to plain text once parsing a page exceeds its CPU time budget.'''
+        pdf_file = os.path.join(sample_path, 'demo-table.pdf')
+        cv = Converter(pdf_file)
+        settings = dict(cv.default_settings, page_cpu_budget=1e-6, page_fallback='text')
+        cv.parse(pages=[0], **settings)
+        page = cv.pages[0]
+        cv.close()
+        assert page.finalized and page.fallback=='text'
+        assert not any(block.is_table_block for section in page.sections \
+                        for column in section for block in column.blocks)
+
+    def test_page_fallback(self):
+        '''test falling back after the page is extracted: page contents are unchanged by clipping
+        images without text, so the fallback page keeps all text.'''
+        pdf_file = os.path.join(sample_path, 'demo-image-vector-graphic.pdf')
+        cv = Converter(pdf_file)
+        settings = cv.default_settings
+        cv.parse(pages=[0], **settings)
+        page, fitz_doc = cv.pages[0], cv.fitz_doc
+        words = [w[4] for w in fitz_doc[0].get_text('words')]
+
+        # plain text, with hidden text checking
+        page.hidden_text = True
+        cv._pages.fallback(page, fitz_doc, 'text', **settings)
+        page.parse(**cv._fallback_settings('text', settings))
+        text = ' '.join(block.text for section in page.sections \
+                    for column in section for block in column.blocks if block.is_text_block)
+        assert all(w in text for w in words)
+
+        # the entire page as an image, same to the rendered source page
+        cv._pages.fallback(page, fitz_doc, 'raster', **settings)
+        page.parse(**cv._fallback_settings('raster', settings))
+        image = [line.spans[0] for section in page.sections for column in section \
+                    for block in column.blocks for line in block.lines][0]
+        zoom = settings['clip_image_res_ratio']
+        with fitz.open(pdf_file) as doc:
+            expected = doc[0].get_pixmap(matrix=fitz.Matrix(zoom, zoom)).samples
+        cv.close()
+        assert fitz.Pixmap(image.image).samples==expected
+
+    def test_service(self):
+        '''test conversion service over HTTP: request limits, job timeout, then worker restart and conversion,
+        and full job queue.'''
+        import asyncio, json
+        from pdf2docx.service import ConversionService
+
+        with open(os.path.join(sample_path, 'demo-table.pdf'), 'rb') as f: pdf = f.read()
+
+        async def request(port, method, target, body=b'', length=None):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            length = len(body) if length is None else length
+            writer.write(f'{method} {target} HTTP/1.1\r\nContent-Length: {length}\r\n\r\n'.encode())
+            writer.write(body)
+            await writer.drain()
+            res = await asyncio.wait_for(reader.read(), 60) # fail rather than hang
+            writer.close()
+            head, _, body = res.partition(b'\r\n\r\n')
+            return int(head.split()[1]), head, body
+
+        async def run():
+            async with ConversionService(workers=1, max_queue_size=1, max_body_size=len(pdf)) as service:
+                server = await service.start_server('127.0.0.1', 0)
+                port = server.sockets[0].getsockname()[1]
+                async with server:
+                    too_large = await request(port, 'POST', '/convert', length=len(pdf)+1)
+                    negative = await request(port, 'POST', '/convert', length=-1)
+                    timeout = await request(port, 'POST', '/convert?timeout=0.01', pdf)
+                    status = await request(port, 'GET', '/status')
+                    converted = await request(port, 'POST', '/convert', pdf)
+                    # one job in worker and one in queue at most
+                    busy = await asyncio.gather(*[request(port, 'POST', '/convert', pdf) for _ in range(3)])
+            return too_large, negative, timeout, status, converted, busy
+
+        (code_large, _, _), (code_negative, _, _), (code_timeout, _, _), (_, _, status), \
+            (code, _, docx), busy = asyncio.run(run())
+        assert code_large==413 and code_negative==400
+        assert code_timeout==504
+        status = json.loads(status)
+        assert status['timeout']==1 and status['workers']==1
+        assert code==200 and docx.startswith(b'PK') # restarted worker converts the next job
+        rejected = [head for code, head, _ in busy if code==503]
+        assert rejected and all(b'\r\nRetry-After: ' in head for head in rejected)
+
+    def test_page_type(self):
+        '''test classifying pages and detecting invisible text by pre-scanning page contents.'''
+        from pdf2docx.common.share import PageType
+        from pdf2docx.page.ContentScanner import ContentScanner
+        for filename, page_type in (('demo-image-rotation', PageType.SCANNED),
+                                    ('demo-text-hidden', PageType.TEXT),
+                                    ('demo-table', PageType.TABULAR)):
+            doc = fitz.open(os.path.join(sample_path, f'{filename}.pdf'))
+            stats = ContentScanner(doc).scan(doc[0])
+            assert stats['type']==page_type
+            assert ContentScanner.has_invisible_text(stats)==(filename=='demo-text-hidden')
+            doc.close()
+
+    def test_ocr(self):
+        '''test recognizing text of scanned page with a pluggable OCR engine.'''
+        pdf_file = os.path.join(sample_path, 'demo-image-rotation.pdf')
+        docx_file = os.path.join(output_path, 'demo-image-rotation-ocr.docx')
+        cv = Converter(pdf_file)
+        cv.convert(docx_file, ocr=1, ocr_engine=FakeOCREngine)
+        page = cv.pages[0]
+        blocks = [block for section in page.sections for column in section \
+                    for block in column.blocks]
+        cv.close()
+        assert [block.text for block in blocks]==['Hello']
+        x, y = blocks[0].bbox.tl # center of page, with page rotation considered
+        assert abs(x-page.width/2)<1 and abs(y-page.height/2)<1
+
+    def test_layout_pdf(self):
+        '''test plotting parsed layout to specified pdf file.'''
+        filename = 'demo-section'
+        pdf_file = os.path.join(sample_path, f'{filename}.pdf')
+        docx_file = os.path.join(output_path, f'{filename}.docx')
+        layout_pdf = os.path.join(output_path, f'layout-{filename}.pdf')
+        if os.path.exists(layout_pdf): os.remove(layout_pdf)
+
+        cv = Converter(pdf_file)
+        cv.convert(docx_file, layout_pdf=layout_pdf)
+        cv.close() # wait for plotting layout
+        assert os.path.isfile(layout_pdf)
     
 
 